@@ -0,0 +1,50 @@
+"""轨迹坐标转换对比: 逐点 wgs84_to_gcj02 vs numpy 批量 wgs84_to_gcj02_batch
+
+python benchmarks/coordinate.py --points 100000
+"""
+import sys
+import time
+import random
+import argparse
+from array import array
+
+sys.path.append(".")
+
+from common.utils import wgs84_to_gcj02, list_dict_to_tuple  # noqa: E402
+from common.coordinate import wgs84_to_gcj02_batch  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100000)
+    args = parser.parse_args()
+
+    track = [(random.uniform(73.0, 135.0), random.uniform(18.0, 53.0)) for _ in range(args.points)]
+    flat = array("d", [v for point in track for v in point])
+    track_dict = [{"lng": lng, "lat": lat} for lng, lat in track]
+
+    start = time.perf_counter()
+    scalar = [wgs84_to_gcj02(lng, lat) for lng, lat in track]
+    scalar_elapsed = time.perf_counter() - start
+    print(f"{'scalar':>24}: {scalar_elapsed * 1000:10.2f}ms")
+
+    start = time.perf_counter()
+    batch = wgs84_to_gcj02_batch(memoryview(flat))
+    batch_elapsed = time.perf_counter() - start
+    print(f"{'batch(memoryview)':>24}: {batch_elapsed * 1000:10.2f}ms, x{scalar_elapsed / batch_elapsed:.1f}")
+
+    start = time.perf_counter()
+    list_dict_to_tuple(track_dict, coordinate_transform=wgs84_to_gcj02_batch)
+    nested_elapsed = time.perf_counter() - start
+    print(f"{'batch(nested)':>24}: {nested_elapsed * 1000:10.2f}ms, x{scalar_elapsed / nested_elapsed:.1f}")
+
+    max_diff = max(
+        abs(a - b)
+        for point, expected in zip(batch.tolist(), scalar, strict=True)
+        for a, b in zip(point, expected, strict=True)
+    )
+    print(f"{'max diff':>24}: {max_diff:.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""启动导入耗时: 以 -X importtime 在新进程中导入模块, 按顶层包汇总, 多轮取中位数
+
+python benchmarks/import_time.py services.entrypoint.factory
+python benchmarks/import_time.py common.fastapi common.encrypt --top 30
+python benchmarks/import_time.py services.entrypoint.factory --save .importtime.json     # 记录基线
+python benchmarks/import_time.py services.entrypoint.factory --compare .importtime.json  # 与基线对比
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(modules: list[str]) -> tuple[int, dict[str, int], dict[str, int]]:
+    """新进程导入, 返回 (总耗时, {顶层包: 耗时}, {模块: 自身耗时}), 单位微秒"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [".", os.environ.get("PYTHONPATH")]))},
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(result.returncode)
+    total = 0
+    packages: dict[str, int] = defaultdict(int)
+    modules_self: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        if len(indent) == 1:
+            total += cumulative_us
+        packages[name.split(".")[0]] += self_us
+        modules_self[name] = self_us
+    return total, packages, modules_self
+
+
+def median_of(runs: list[dict[str, int]]) -> dict[str, int]:
+    keys = {k for run in runs for k in run}
+    return {k: int(statistics.median(run.get(k, 0) for run in runs)) for k in keys}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="+")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--save", help="保存结果为 json 基线")
+    parser.add_argument("--compare", help="与 json 基线对比")
+    args = parser.parse_args()
+
+    runs = [measure(args.modules) for _ in range(args.rounds)]
+    total = int(statistics.median(run[0] for run in runs))
+    packages = median_of([run[1] for run in runs])
+    modules = median_of([run[2] for run in runs])
+
+    baseline = None
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    def delta(current: int, previous: int | None) -> str:
+        return "" if previous is None else f"  ({(current - previous) / 1000:+9.2f}ms)"
+
+    print(f"{'total':>40}: {total / 1000:9.2f}ms" + delta(total, baseline and baseline["total"]))
+    print("\nby top-level package (self time):")
+    for name, us in sorted(packages.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"{name:>40}: {us / 1000:9.2f}ms" + delta(us, baseline and baseline["packages"].get(name, 0)))
+    print("\nslowest modules (self time):")
+    for name, us in sorted(modules.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"{name:>40}: {us / 1000:9.2f}ms")
+    if baseline:
+        removed = sorted(set(baseline["packages"]) - set(packages))
+        added = sorted(set(packages) - set(baseline["packages"]))
+        print(f"\nno longer imported: {removed}\nnewly imported: {added}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"modules": args.modules, "total": total, "packages": packages}, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""HTTP 压测: 本地启动服务, 对比不同事件循环/HTTP 解析器组合下的吞吐与延迟分位数
+
+python benchmarks/load.py
+python benchmarks/load.py --combos asyncio:h11 uvloop:httptools --concurrency 64 --duration 10
+python benchmarks/load.py --path "/user/v1/account?page=1&size=20" --header "Authorization: Bearer xxx"
+
+每个组合以单进程 uvicorn 启动(与 gunicorn worker 内相同的 loop/http 配置), 压测端与服务端
+运行在同一台机器上, 结果只用于组合间对比; 默认压测生产入口(含全部挂载的子服务与中间件),
+健康检查以外的接口需通过 --header 携带鉴权信息, 账户列表接口依赖数据库
+"""
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+from dataclasses import field, dataclass
+
+import httpx
+
+sys.path.append(".")
+
+DEFAULT_APP = "services.entrypoint.factory:service_api"
+DEFAULT_PATHS = ["/user/health"]
+# 无需鉴权的路径后缀
+PUBLIC_PATH_SUFFIXES = ("/health", "/livez", "/readyz")
+DEFAULT_COMBOS = ["asyncio:h11", "asyncio:httptools", "uvloop:h11", "uvloop:httptools"]
+
+
+@dataclass
+class LoadResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+    def report(self, name: str) -> None:
+        rps = len(self.latencies) / self.elapsed if self.elapsed else 0
+        print(
+            f"{name:>36}: {rps:10.1f} req/s"
+            f"  p50 {self.percentile(0.5) * 1000:8.2f}ms"
+            f"  p90 {self.percentile(0.9) * 1000:8.2f}ms"
+            f"  p99 {self.percentile(0.99) * 1000:8.2f}ms"
+            f"  errors {self.errors}",
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app: str, port: int, loop: str, http: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            app,
+            "--port",
+            str(port),
+            "--loop",
+            loop,
+            "--http",
+            http,
+            "--no-access-log",
+            "--log-level",
+            "warning",
+        ],
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, path: str, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await client.get(path)
+            return
+        except httpx.TransportError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int, duration: float) -> LoadResult:
+    result = LoadResult()
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                result.latencies.append(time.perf_counter() - start)
+            else:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+async def bench(args: argparse.Namespace, loop: str, http: str) -> None:
+    port = free_port()
+    server = start_server(args.app, port, loop, http)
+    headers = dict(h.split(":", 1) for h in args.header)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}",
+            headers={k.strip(): v.strip() for k, v in headers.items()},
+            limits=limits,
+            timeout=30,
+        ) as client:
+            await wait_ready(client, args.path[0], args.startup_timeout)
+            for path in args.path:
+                if args.warmup:
+                    await run_load(client, path, args.concurrency, args.warmup)
+                result = await run_load(client, path, args.concurrency, args.duration)
+                result.report(f"{loop}:{http} {path}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default=DEFAULT_APP)
+    parser.add_argument("--combos", nargs="+", default=DEFAULT_COMBOS, help="loop:http")
+    parser.add_argument("--path", action="append", help=f"压测路径, 可多次指定, 默认 {DEFAULT_PATHS}")
+    parser.add_argument("--header", action="append", default=[], help='请求头, 如 "Authorization: Bearer xxx"')
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--startup-timeout", type=float, default=30)
+    args = parser.parse_args()
+    args.path = args.path or DEFAULT_PATHS
+    protected = [p for p in args.path if not urlsplit(p).path.rstrip("/").endswith(PUBLIC_PATH_SUFFIXES)]
+    if protected and not args.header:
+        parser.error(f"{protected} 需要鉴权, 请通过 --header 指定, 如 --header 'Authorization: Bearer xxx'")
+
+    for combo in args.combos:
+        loop, http = combo.split(":")
+        asyncio.run(bench(args, loop, http))
+
+
+if __name__ == "__main__":
+    main()
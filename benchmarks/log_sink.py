@@ -0,0 +1,69 @@
+"""访问日志开销对比: print(dict) sink vs BufferedJsonSink
+
+python benchmarks/log_sink.py --records 50000
+"""
+import os
+import sys
+import time
+import argparse
+from collections.abc import Callable
+
+sys.path.append(".")
+
+from loguru import logger  # noqa: E402
+
+from common.log import BufferedJsonSink, serialize  # noqa: E402
+
+ACCESS_INFO = {
+    "method": "GET",
+    "uri": "/user/v1/account",
+    "client": "127.0.0.1",
+    "process_time": 12.345,
+}
+
+
+def print_dict_sink(message) -> None:  # noqa: ANN001
+    # 旧实现: 每条记录 print 一次 dict 的 repr
+    print(serialize(message.record))
+
+
+def run(name: str, sink: Callable, records: int) -> None:
+    logger.remove()
+    logger.add(sink, format="{message}", enqueue=True)
+    start = time.perf_counter()
+    for _ in range(records):
+        logger.bind(name="_info.request").info(ACCESS_INFO)
+    emitted = time.perf_counter() - start
+    logger.complete()
+    logger.remove()
+    if isinstance(sink, BufferedJsonSink):
+        sink.stop()
+    total = time.perf_counter() - start
+    print(
+        f"{name:>18}: {emitted / records * 1e6:8.2f}us/request on caller, "
+        f"{total / records * 1e6:8.2f}us/request until written",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=50000)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            run("print(dict)", print_dict_sink, args.records)
+        finally:
+            sys.stdout = stdout
+
+    with open(os.devnull, "wb") as devnull:
+        sink = BufferedJsonSink(stream=devnull)
+        run("BufferedJsonSink", sink, args.records)
+        print(f"{'dropped':>18}: {sink.dropped}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""登录密码校验吞吐对比: 同步 bcrypt vs 线程池 bcrypt
+
+python benchmarks/password_hash.py --concurrency 32 --requests 128
+"""
+import sys
+import time
+import asyncio
+import argparse
+
+sys.path.append(".")
+
+from common.encrypt import PasswordUtil  # noqa: E402
+
+PLAIN_PASSWORD = "JustForTest"
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """事件循环最大延迟(秒)"""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+async def run(mode: str, hashed: str, concurrency: int, total: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            if mode == "sync":
+                assert PasswordUtil.verify_password(PLAIN_PASSWORD, hashed)
+            else:
+                assert await PasswordUtil.async_verify_password(PLAIN_PASSWORD, hashed)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_lag = await lag_task
+    print(
+        f"{mode:>6}: {total / elapsed:8.2f} logins/s, total {elapsed:6.2f}s, "
+        f"max event loop lag {max_lag * 1000:8.2f}ms",
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--workers", type=int, default=PasswordUtil.max_workers)
+    args = parser.parse_args()
+
+    PasswordUtil.max_workers = args.workers
+    hashed = PasswordUtil.get_password_hash(PLAIN_PASSWORD)
+    for mode in ("sync", "async"):
+        asyncio.run(run(mode, hashed, args.concurrency, args.requests))
+    print("executor:", PasswordUtil.executor_stats())
+    PasswordUtil.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
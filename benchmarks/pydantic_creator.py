@@ -0,0 +1,104 @@
+"""pydantic_model_creator 生成耗时: 首次生成 vs 重复调用(旧实现: 每次 describe 并遍历字段后按名称去重) vs 按参数缓存
+
+python benchmarks/pydantic_creator.py --models 60
+"""
+import sys
+import time
+import types
+import argparse
+from collections.abc import Callable
+
+sys.path.append(".")
+
+from tortoise import Tortoise, fields  # noqa: E402
+from tortoise.models import Model  # noqa: E402
+
+from common.pydantic import _SUB_FIELDS_MODELS, create_sub_fields_model  # noqa: E402
+from common.tortoise.contrib.pydantic import creator  # noqa: E402
+
+MODULE = "benchmark_models"
+
+
+def define_models(count: int) -> list[type[Model]]:
+    """count 个模型, 每个模型外键关联前一个"""
+    module = types.ModuleType(MODULE)
+    sys.modules[MODULE] = module
+    models = []
+    for i in range(count):
+        attrs = {
+            "__module__": MODULE,
+            "__doc__": f"实体{i}",
+            "id": fields.IntField(pk=True),
+            "name": fields.CharField(max_length=64, description="名称"),
+            "code": fields.CharField(max_length=32, unique=True, description="编码"),
+            "status": fields.IntField(default=0, description="状态"),
+            "enabled": fields.BooleanField(default=True, description="是否启用"),
+            "amount": fields.DecimalField(max_digits=12, decimal_places=2, null=True, description="金额"),
+            "remark": fields.TextField(null=True, description="备注"),
+            "created_at": fields.DatetimeField(auto_now_add=True, description="创建时间"),
+        }
+        if models:
+            attrs["parent"] = fields.ForeignKeyField(
+                f"benchmark.Entity{i - 1}",
+                related_name=f"children{i}",
+                null=True,
+            )
+        model = type(f"Entity{i}", (Model,), attrs)
+        setattr(module, model.__name__, model)
+        models.append(model)
+    Tortoise.init_models([MODULE], "benchmark")
+    return models
+
+
+def build_schemas(models: list[type[Model]]) -> list:
+    # 与 storages/relational/schema 中的用法一致: 列表、创建、指定字段
+    result = []
+    for model in models:
+        result.append(creator.pydantic_model_creator(model, name=f"{model.__name__}List"))
+        result.append(creator.pydantic_model_creator(model, name=f"{model.__name__}Create", exclude_readonly=True))
+        result.append(creator.pydantic_model_creator(model, include=("id", "name", "code", "parent_id", "parent")))
+    return result
+
+
+def build_sub_fields(schemas: list) -> list:
+    return [create_sub_fields_model(schema, {"id", "name"}) for schema in schemas]
+
+
+def timeit(name: str, func: Callable, rounds: int, before: Callable | None = None) -> list:
+    elapsed = 0.0
+    for _ in range(rounds):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = func()
+        elapsed += time.perf_counter() - start
+    print(f"{name:>32}: {elapsed / rounds * 1000:10.3f}ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", type=int, default=60)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    models = define_models(args.models)
+    print(f"{args.models} models, {args.models * 3} schemas")
+
+    first = timeit("first build", lambda: build_schemas(models), 1)
+    legacy = timeit(
+        "repeat, legacy",
+        lambda: build_schemas(models),
+        args.rounds,
+        before=creator._CREATOR_INDEX.clear,
+    )
+    cached = timeit("repeat, memoized", lambda: build_schemas(models), args.rounds)
+    assert first == legacy == cached
+
+    sub_legacy = timeit("sub fields, legacy", lambda: build_sub_fields(first), args.rounds, _SUB_FIELDS_MODELS.clear)
+    sub_cached = timeit("sub fields, memoized", lambda: build_sub_fields(first), args.rounds)
+    assert [m.model_fields.keys() for m in sub_legacy] == [m.model_fields.keys() for m in sub_cached]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""TimestampField 整数时间戳转换对比: 逐行读取配置时区 vs 字段缓存时区 vs 整列批量转换
+
+python benchmarks/timestamp_field.py --rows 100000
+python benchmarks/timestamp_field.py --rows 100000 --distinct 3600  # 时序数据, 时间戳重复率高
+"""
+import sys
+import time
+import random
+import datetime
+import argparse
+from collections.abc import Callable
+
+sys.path.append(".")
+
+from common.tortoise.fields.base import TimestampField  # noqa: E402
+
+
+def legacy_to_python_value(value: int | None) -> datetime.datetime | None:
+    # 旧实现
+    if value is None or value in [0, "0"]:
+        return None
+    from conf.config import local_configs
+
+    return datetime.datetime.fromtimestamp(value, local_configs.relational.timezone)
+
+
+def timeit(name: str, func: Callable, rounds: int) -> list:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{name:>24}: {elapsed * 1000:10.3f}ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=0, help="不同时间戳个数, 0 表示全部不同")
+    parser.add_argument("--deleted-ratio", type=float, default=0.1, help="deleted_at 非 0 的比例")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    now = int(time.time())
+    distinct = args.distinct or args.rows
+    values = [
+        now - random.randrange(distinct) if random.random() < args.deleted_ratio else 0 for _ in range(args.rows)
+    ]
+    field = TimestampField()
+
+    legacy = timeit("legacy per value", lambda: [legacy_to_python_value(v) for v in values], args.rounds)
+    cached = timeit("cached tz per value", lambda: [field.to_python_value(v) for v in values], args.rounds)
+    bulk = timeit("bulk column", lambda: field.to_python_values(values), args.rounds)
+    assert legacy == cached == bulk
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""列表读取: from_queryset(Tortoise 实例化 + model_validate) vs from_queryset_trusted(values + model_construct)
+
+python benchmarks/trusted_read.py --rows 1000
+"""
+import sys
+import time
+import asyncio
+import argparse
+from collections.abc import Callable, Awaitable
+
+sys.path.append(".")
+
+from tortoise import Tortoise  # noqa: E402
+
+from common.monkey_patch import patch  # noqa: E402
+from storages.relational.schema.account import AccountList  # noqa: E402
+from storages.relational.models.account import Account, Company  # noqa: E402
+
+
+async def timeit(name: str, func: Callable[[], Awaitable[list]], rows: int, rounds: int) -> list:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = await func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{name:>24}: {elapsed * 1000:10.3f}ms {elapsed / rows * 1_000_000:8.2f}us/row")
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    patch()
+    # sqlite 内存库, 仅比较 ORM/序列化开销
+    await Tortoise.init(
+        config={
+            "connections": {"user_center": "sqlite://:memory:", "asset_center": "sqlite://:memory:"},
+            "apps": {
+                "user_center": {"models": ["storages.relational.models.account"], "default_connection": "user_center"},
+                "asset_center": {
+                    "models": ["storages.relational.models.vehicle"],
+                    "default_connection": "asset_center",
+                },
+            },
+        },
+    )
+    try:
+        await Tortoise.generate_schemas()
+        companies = [await Company.create(name=f"company{i}") for i in range(args.companies)]
+        await Account.bulk_create(
+            [Account(name=f"account{i}", company=companies[i % len(companies)]) for i in range(args.rows)],
+        )
+        queryset = Account.all().order_by("name")
+
+        validated = await timeit("from_queryset", lambda: AccountList.from_queryset(queryset), args.rows, args.rounds)
+        trusted = await timeit(
+            "from_queryset_trusted",
+            lambda: AccountList.from_queryset_trusted(queryset),
+            args.rows,
+            args.rounds,
+        )
+        assert [m.model_dump_json() for m in validated] == [m.model_dump_json() for m in trusted]
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""BinaryUUIDField 批量 id__in 查询对比: UUID_TO_BIN RawSQL vs 16字节原始值
+
+python benchmarks/uuid_field.py --ids 5000
+python benchmarks/uuid_field.py --ids 5000 --execute  # 连接 etc 配置中的数据库实际执行
+"""
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+from collections.abc import Callable
+
+sys.path.append(".")
+
+from tortoise import Tortoise  # noqa: E402
+from tortoise.expressions import RawSQL  # noqa: E402
+
+from conf.config import local_configs  # noqa: E402
+from common.utils import sequential_uuid_from_ulid  # noqa: E402
+from common.monkey_patch import patch  # noqa: E402
+from storages.relational.models.account import Company  # noqa: E402
+
+
+def legacy_to_db_value(value: uuid.UUID) -> RawSQL:
+    # 旧实现
+    return RawSQL(f"UUID_TO_BIN('{value}')")
+
+
+def timeit(name: str, func: Callable, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{name:>36}: {elapsed * 1000:10.3f}ms")
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ids", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--execute", action="store_true")
+    args = parser.parse_args()
+
+    patch()
+    await Tortoise.init(config=local_configs.relational.tortoise_orm_config)
+    field = Company._meta.fields_map["id"]
+    ids = [sequential_uuid_from_ulid() for _ in range(args.ids)]
+
+    legacy_values = timeit("encode RawSQL", lambda: [legacy_to_db_value(i) for i in ids], args.rounds)
+    values = timeit("encode bytes", lambda: [field.to_db_value(i, Company) for i in ids], args.rounds)
+    timeit("decode bytes", lambda: [field.to_python_value(v) for v in values], args.rounds)
+
+    legacy_sql = timeit(
+        "build id__in SQL RawSQL",
+        lambda: Company.filter(id__in=legacy_values).values_list("id", flat=True).sql(),
+        args.rounds,
+    )
+    sql = timeit(
+        "build id__in SQL bytes",
+        lambda: Company.filter(id__in=ids).values_list("id", flat=True).sql(),
+        args.rounds,
+    )
+    print(f"{'SQL size RawSQL':>36}: {len(legacy_sql):10d}B")
+    print(f"{'SQL size bytes':>36}: {len(sql):10d}B")
+
+    if args.execute:
+        for name, filter_values in (("RawSQL", legacy_values), ("bytes", ids)):
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                await Company.filter(id__in=filter_values).values_list("id", flat=True)
+            elapsed = (time.perf_counter() - start) / args.rounds
+            print(f"{'execute id__in ' + name:>36}: {elapsed * 1000:10.3f}ms")
+
+    await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
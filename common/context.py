@@ -10,13 +10,15 @@ from starlette.responses import Response
 from starlette.datastructures import MutableHeaders
 from starlette_context.plugins import Plugin
 
-from common.log import logger
+from common.log import logger, access_log_limiter
 from common.enums import (
+    BackendKindEnum,
     ContextKeyEnum,
     ResponseCodeEnum,
     InfoLoggerNameEnum,
     ResponseHeaderKeyEnum,
 )
+from common.metrics import RequestStats, route_metrics
 
 request_id_var: ContextVar[str] = ContextVar(
     ContextKeyEnum.request_id.value,
@@ -77,6 +79,51 @@ class RequestStartTimestampPlugin(Plugin):
         return time.time()
 
 
+def record_backend_call(kind: BackendKindEnum, name: str, duration: float, count: int = 1) -> None:
+    """计入当前请求的 RequestStats, 请求外的调用忽略"""
+    if not context.exists():
+        return
+    stats: RequestStats | None = context.get(ContextKeyEnum.request_stats.value)
+    if stats is not None:
+        stats.record(kind.value, name, duration, count)
+
+
+class RequestStatsPlugin(Plugin):
+    """请求内数据库、Redis、ClickHouse、HBase 调用统计, 需位于 RequestProcessInfoPlugin 之前"""
+
+    key = ContextKeyEnum.request_stats.value
+
+    def __init__(self, server_timing: bool = False, route_metrics_enabled: bool = True) -> None:
+        self.server_timing = server_timing
+        self.route_metrics_enabled = route_metrics_enabled
+
+    async def process_request(
+        self,
+        request: Request | HTTPConnection,
+    ) -> Any | None:
+        # 路由匹配后 scope 中才有 route
+        return RequestStats(request.scope)
+
+    async def enrich_response(
+        self,
+        response: Response | Message,
+    ) -> None:
+        stats: RequestStats | None = context.get(self.key)
+        if stats is None or not isinstance(response, Response):
+            return
+        if self.server_timing and stats.calls:
+            response.headers.append(ResponseHeaderKeyEnum.server_timing.value, stats.server_timing())
+        if self.route_metrics_enabled and stats.scope is not None:
+            route = stats.scope.get("route")
+            route_metrics.observe(
+                stats.scope.get("method", ""),
+                getattr(route, "path", None) or route_metrics.UNMATCHED_ROUTE,
+                response.status_code,
+                time.perf_counter() - stats.start,
+                stats,
+            )
+
+
 class RequestProcessInfoPlugin(Plugin):
     """请求、响应相关的日志"""
 
@@ -113,9 +160,15 @@ class RequestProcessInfoPlugin(Plugin):
                 )
         info_dict = context.get(self.key)
         info_dict["process_time"] = process_time  # type: ignore
+        stats: RequestStats | None = context.get(RequestStatsPlugin.key)
+        if stats is not None and stats.calls:
+            info_dict["backends"] = stats.summary()  # type: ignore
         code = context.get(ContextKeyEnum.response_code.value)
-        if code is not None and code != ResponseCodeEnum.success.value:
+        failed = code is not None and code != ResponseCodeEnum.success.value
+        if failed:
             data = context.get(ContextKeyEnum.response_data.value)
             info_dict["response_data"] = data  # type: ignore
+        elif not access_log_limiter.allow():
+            return
 
         logger.bind(name=InfoLoggerNameEnum.info_request_logger.value).info(info_dict)
@@ -0,0 +1,155 @@
+"""
+坐标系批量转换: WGS84 / GCJ02(火星坐标系) / BD09(百度坐标系)
+
+基于 numpy 向量化, 需安装 geo extra: poetry install -E geo
+点位为 [lng, lat], 入参可为 (n, 2) 数组、扁平的 [lng, lat, lng, lat, ...]
+或支持缓冲区协议的 memoryview/array("d"), 返回 (n, 2) 的 float64 数组
+"""
+from typing import Any
+from collections.abc import Callable
+
+import numpy as np
+
+A = 6378245.0  # 长半轴
+EE = 0.00669342162296594323  # 偏心率平方
+X_PI = np.pi * 3000.0 / 180.0
+
+# 中国境外的坐标不做偏移
+CHINA_LNG_RANGE = (72.004, 137.8347)
+CHINA_LAT_RANGE = (0.8293, 55.8271)
+
+CoordinateTransform = Callable[[Any], np.ndarray]
+
+
+def as_points(points: Any) -> np.ndarray:  # ruff: noqa: ANN401
+    """转换为 (n, 2) 的 float64 数组, 数组/缓冲区入参不复制"""
+    array = np.asarray(points, dtype=np.float64)
+    if array.ndim == 1:
+        array = array.reshape(-1, 2)
+    if array.ndim != 2 or array.shape[1] != 2:
+        raise ValueError(f"points must be shaped as (n, 2), got {array.shape}")
+    return array
+
+
+def out_of_china(lng: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    in_china_lng = (lng > CHINA_LNG_RANGE[0]) & (lng < CHINA_LNG_RANGE[1])
+    in_china_lat = (lat > CHINA_LAT_RANGE[0]) & (lat < CHINA_LAT_RANGE[1])
+    return ~(in_china_lng & in_china_lat)
+
+
+def _transform_lat(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    ret = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.1 * x * y + 0.2 * np.sqrt(np.abs(x))
+    ret += (20.0 * np.sin(6.0 * x * np.pi) + 20.0 * np.sin(2.0 * x * np.pi)) * 2.0 / 3.0
+    ret += (20.0 * np.sin(y * np.pi) + 40.0 * np.sin(y / 3.0 * np.pi)) * 2.0 / 3.0
+    ret += (160.0 * np.sin(y / 12.0 * np.pi) + 320 * np.sin(y * np.pi / 30.0)) * 2.0 / 3.0
+    return ret
+
+
+def _transform_lng(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    ret = 300.0 + x + 2.0 * y + 0.1 * x * x + 0.1 * x * y + 0.1 * np.sqrt(np.abs(x))
+    ret += (20.0 * np.sin(6.0 * x * np.pi) + 20.0 * np.sin(2.0 * x * np.pi)) * 2.0 / 3.0
+    ret += (20.0 * np.sin(x * np.pi) + 40.0 * np.sin(x / 3.0 * np.pi)) * 2.0 / 3.0
+    ret += (150.0 * np.sin(x / 12.0 * np.pi) + 300.0 * np.sin(x / 30.0 * np.pi)) * 2.0 / 3.0
+    return ret
+
+
+def _gcj02_offset(lng: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """WGS84 -> GCJ02 的偏移量, 境外为 0"""
+    dlat = _transform_lat(lng - 105.0, lat - 35.0)
+    dlng = _transform_lng(lng - 105.0, lat - 35.0)
+    radlat = lat / 180.0 * np.pi
+    magic = 1 - EE * np.sin(radlat) ** 2
+    sqrtmagic = np.sqrt(magic)
+    dlat = (dlat * 180.0) / ((A * (1 - EE)) / (magic * sqrtmagic) * np.pi)
+    dlng = (dlng * 180.0) / (A / sqrtmagic * np.cos(radlat) * np.pi)
+    outside = out_of_china(lng, lat)
+    dlng[outside] = 0.0
+    dlat[outside] = 0.0
+    return dlng, dlat
+
+
+def wgs84_to_gcj02_batch(points: Any) -> np.ndarray:  # ruff: noqa: ANN401
+    """WGS84 -> GCJ02"""
+    array = as_points(points)
+    lng, lat = array[:, 0], array[:, 1]
+    dlng, dlat = _gcj02_offset(lng, lat)
+    return np.column_stack((lng + dlng, lat + dlat))
+
+
+def gcj02_to_wgs84_batch(points: Any, iterations: int = 1) -> np.ndarray:  # ruff: noqa: ANN401
+    """GCJ02 -> WGS84, 以 GCJ02 点位处的偏移量近似, 每多迭代一次误差约缩小两个数量级"""
+    array = as_points(points)
+    lng, lat = array[:, 0], array[:, 1]
+    wgs_lng, wgs_lat = lng, lat
+    for _ in range(max(iterations, 1)):
+        dlng, dlat = _gcj02_offset(wgs_lng, wgs_lat)
+        wgs_lng, wgs_lat = lng - dlng, lat - dlat
+    return np.column_stack((wgs_lng, wgs_lat))
+
+
+def gcj02_to_bd09_batch(points: Any) -> np.ndarray:  # ruff: noqa: ANN401
+    """GCJ02 -> BD09"""
+    array = as_points(points)
+    lng, lat = array[:, 0], array[:, 1]
+    z = np.sqrt(lng * lng + lat * lat) + 0.00002 * np.sin(lat * X_PI)
+    theta = np.arctan2(lat, lng) + 0.000003 * np.cos(lng * X_PI)
+    return np.column_stack((z * np.cos(theta) + 0.0065, z * np.sin(theta) + 0.006))
+
+
+def bd09_to_gcj02_batch(points: Any) -> np.ndarray:  # ruff: noqa: ANN401
+    """BD09 -> GCJ02"""
+    array = as_points(points)
+    lng, lat = array[:, 0] - 0.0065, array[:, 1] - 0.006
+    z = np.sqrt(lng * lng + lat * lat) - 0.00002 * np.sin(lat * X_PI)
+    theta = np.arctan2(lat, lng) - 0.000003 * np.cos(lng * X_PI)
+    return np.column_stack((z * np.cos(theta), z * np.sin(theta)))
+
+
+def wgs84_to_bd09_batch(points: Any) -> np.ndarray:  # ruff: noqa: ANN401
+    """WGS84 -> BD09"""
+    return gcj02_to_bd09_batch(wgs84_to_gcj02_batch(points))
+
+
+def bd09_to_wgs84_batch(points: Any, iterations: int = 1) -> np.ndarray:  # ruff: noqa: ANN401
+    """BD09 -> WGS84"""
+    return gcj02_to_wgs84_batch(bd09_to_gcj02_batch(points), iterations)
+
+
+def _is_position(value: Any) -> bool:  # ruff: noqa: ANN401
+    return isinstance(value, list | tuple) and len(value) >= 2 and isinstance(value[0], int | float)
+
+
+def _collect(data: Any, points: list[tuple[float, float]]) -> None:  # ruff: noqa: ANN401
+    if isinstance(data, dict):
+        points.append((data["lng"], data["lat"]))
+    elif _is_position(data):
+        points.append((data[0], data[1]))
+    else:
+        for item in data:
+            _collect(item, points)
+
+
+def _rebuild(data: Any, points: list[list[float]], index: int) -> tuple[Any, int]:  # ruff: noqa: ANN401
+    if isinstance(data, dict):
+        lng, lat = points[index]
+        return {**data, "lng": lng, "lat": lat}, index + 1
+    if _is_position(data):
+        lng, lat = points[index]
+        return type(data)((lng, lat, *data[2:])), index + 1
+    result = []
+    for item in data:
+        rebuilt, index = _rebuild(item, points, index)
+        result.append(rebuilt)
+    return (tuple(result) if isinstance(data, tuple) else result), index
+
+
+def transform_nested(data: Any, transform: CoordinateTransform) -> Any:  # ruff: noqa: ANN401
+    """
+    转换任意嵌套的点位结构, 保持原有结构
+    叶子节点可为 {"lng": .., "lat": ..} 或 GeoJSON 的 [lng, lat(, ...)], 所有点位一次性批量转换
+    """
+    points: list[tuple[float, float]] = []
+    _collect(data, points)
+    if not points:
+        return data
+    return _rebuild(data, transform(points).tolist(), 0)[0]
@@ -1,20 +1,27 @@
+"""
+Cryptodome、passlib、jose 在首次使用时才导入, 仅使用签名/哈希等功能的服务启动时不加载
+"""
 import os
 import hmac
 import base64
+import asyncio
+import hashlib
 import binascii
-from typing import Any, Generic, TypeVar
-from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
+from collections.abc import Mapping, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 
 import orjson
-from jose import jwt, constants
 from pydantic import BaseModel
-from Cryptodome import Random
-from Cryptodome.Hash import MD5, SHA1, SHA256
-from passlib.context import CryptContext  # type: ignore
-from Cryptodome.Cipher import AES, PKCS1_v1_5
-from Cryptodome.PublicKey import RSA
-from Cryptodome.Signature import pkcs1_15 as SIGN_PKCS1_15
-from Cryptodome.Util.Padding import pad, unpad
+
+if TYPE_CHECKING:
+    from Cryptodome.PublicKey import RSA
+    from passlib.context import CryptContext  # type: ignore
+
+R = TypeVar("R")
+
+AES_MODE_ECB = 1  # Cryptodome.Cipher.AES.MODE_ECB
+AES_BLOCK_SIZE = 16  # Cryptodome.Cipher.AES.block_size
 
 
 class AESUtil:
@@ -24,35 +31,56 @@ class AESUtil:
         self,
         key: str,
         style: str = "pkcs7",
-        mode: int = AES.MODE_ECB,
+        mode: int = AES_MODE_ECB,
     ) -> None:
         """128位（16字节）、192位（24字节）或256位（32字节）"""
+        from Cryptodome.Cipher import AES
+        from Cryptodome.Util.Padding import pad, unpad
+
+        self._aes = AES
+        self._pad = pad
+        self._unpad = unpad
         self.mode = mode
         self.style = style
         self.key = key.encode()
+        # ECB 无 IV 等状态, cipher 对象可复用
+        self._cipher = AES.new(self.key, self.mode) if mode == AES.MODE_ECB else None  # type: ignore
+
+    def _get_cipher(self) -> Any:  # ruff: noqa: ANN401
+        return self._cipher or self._aes.new(self.key, self.mode)  # type: ignore
+
+    @staticmethod
+    def _encode(data: bytes) -> bytes:
+        return base64.b64encode(data)
+
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        return base64.b64decode(data)
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        return self._encode(self._get_cipher().encrypt(self._pad(data, AES_BLOCK_SIZE, style=self.style)))
+
+    def decrypt_bytes(self, data: bytes) -> bytes:
+        return self._unpad(self._get_cipher().decrypt(self._decode(data)), AES_BLOCK_SIZE, style=self.style)
+
+    def encrypt_many(self, items: Iterable[bytes]) -> list[bytes]:
+        cipher, pad = self._get_cipher(), self._pad
+        return [self._encode(cipher.encrypt(pad(i, AES_BLOCK_SIZE, style=self.style))) for i in items]
+
+    def decrypt_many(self, items: Iterable[bytes]) -> list[bytes]:
+        cipher, unpad = self._get_cipher(), self._unpad
+        return [unpad(cipher.decrypt(self._decode(i)), AES_BLOCK_SIZE, style=self.style) for i in items]
 
     def encrypt_data(self, data: str) -> str:
-        aes = AES.new(self.key, self.mode)  # type: ignore
-        pad_data = pad(data.encode(), AES.block_size, style=self.style)
-        return str(
-            base64.encodebytes(aes.encrypt(pad_data)),
-            encoding="utf8",
-        ).replace("\n", "")
+        return self.encrypt_bytes(data.encode()).decode()
 
     def decrypt_data(self, data: str) -> str:
-        aes = AES.new(self.key, self.mode)  # type: ignore
-        pad_data = pad(data.encode(), AES.block_size, style=self.style)
-        return str(
-            unpad(
-                aes.decrypt(base64.decodebytes(pad_data)),
-                block_size=AES.block_size,
-            ).decode("utf8"),
-        )
+        return self.decrypt_bytes(data.encode()).decode()
 
     @staticmethod
     def generate_key(length: int = 256) -> str:
         random_key = os.urandom(length)
-        private_key = SHA256.new(random_key).digest()
+        private_key = hashlib.sha256(random_key).digest()
         return base64.b64encode(private_key).decode()
 
 
@@ -61,16 +89,13 @@ class AESUtilHex(AESUtil):
     aes 加密与解密
     """
 
-    def encrypt_data(self, data: str) -> str:
-        data: bytes = data.encode()  # type: ignore
-        aes = AES.new(self.key, self.mode)  # type: ignore
-        pad_data = pad(data, AES.block_size, style=self.style)  # type: ignore
-        return binascii.hexlify(aes.encrypt(pad_data)).decode()
+    @staticmethod
+    def _encode(data: bytes) -> bytes:
+        return binascii.hexlify(data)
 
-    def decrypt_data(self, data: str) -> str:
-        data = binascii.unhexlify(data)  # type: ignore
-        aes = AES.new(self.key, self.mode)  # type: ignore
-        return unpad(aes.decrypt(data), AES.block_size).decode()
+    @staticmethod
+    def _decode(data: bytes) -> bytes:
+        return binascii.unhexlify(data)
 
 
 class RSAUtil:
@@ -81,17 +106,16 @@ class RSAUtil:
         openssl rsa -in jwt-key -pubout -out jwt-key.pub
     """
 
-    private_key: RSA.RsaKey
-    pub_key: RSA.RsaKey
-
-    en_decrypt_module = PKCS1_v1_5
-    sign_nodule = SIGN_PKCS1_15
+    private_key: "RSA.RsaKey"
+    pub_key: "RSA.RsaKey"
 
     def __init__(
         self,
         pub_key_path: str,
         private_key_path: str,
     ) -> None:
+        from Cryptodome.PublicKey import RSA
+
         if pub_key_path:
             with open(private_key_path, "rb") as f:
                 self.private_key = RSA.import_key(f.read())
@@ -99,9 +123,21 @@ class RSAUtil:
             with open(pub_key_path, "rb") as f:
                 self.pub_key = RSA.import_key(f.read())
 
+    @property
+    def en_decrypt_module(self) -> Any:  # ruff: noqa: ANN401
+        from Cryptodome.Cipher import PKCS1_v1_5
+
+        return PKCS1_v1_5
+
+    @property
+    def sign_nodule(self) -> Any:  # ruff: noqa: ANN401
+        from Cryptodome.Signature import pkcs1_15
+
+        return pkcs1_15
+
     def encrypt(self, text: str, length: int = 200) -> str:
         """Rsa 加密."""
-        cipher = PKCS1_v1_5.new(self.pub_key)
+        cipher = self.en_decrypt_module.new(self.pub_key)
         res = []
         for i in range(0, len(text), length):
             text_item = text[i : i + length]
@@ -111,37 +147,41 @@ class RSAUtil:
 
     def decrypt(self, text: str) -> str:
         """Rsa 解密."""
-        cipher = PKCS1_v1_5.new(self.private_key)
+        from Cryptodome import Random
+        from Cryptodome.Hash import SHA1
+
+        cipher = self.en_decrypt_module.new(self.private_key)
         return cipher.decrypt(
             base64.b64decode(text),
             Random.new().read(15 + SHA1.digest_size),
         ).decode()
 
-    def gen_sign_str(self, data: dict) -> str:
-        params_str = ""
+    def gen_sign_bytes(self, data: dict) -> bytes:
         if not data:
-            return params_str
+            return b""
         if not isinstance(data, dict):
             raise TypeError("dict required")
-        # for k in sorted(data.keys()):
-        #     params_str += str(k)+ str(data[k])
-        params_str = orjson.dumps(data, option=orjson.OPT_SORT_KEYS).decode()
-        return params_str
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+
+    def gen_sign_str(self, data: dict) -> str:
+        return self.gen_sign_bytes(data).decode()
 
     def sign(self, data: dict) -> str:
         """Rsa 签名."""
-        text = self.gen_sign_str(data)
-        raw_sign = SIGN_PKCS1_15.new(self.private_key).sign(
-            SHA256.new(text.encode()),
+        from Cryptodome.Hash import SHA256
+
+        raw_sign = self.sign_nodule.new(self.private_key).sign(
+            SHA256.new(self.gen_sign_bytes(data)),
         )
-        return MD5.new(raw_sign).hexdigest()
+        return hashlib.md5(raw_sign).hexdigest()  # noqa: S324
 
     def verify(self, sign: str, data: dict) -> bool:
         """验签."""
-        text = self.gen_sign_str(data)
+        from Cryptodome.Hash import SHA256
+
         try:
-            SIGN_PKCS1_15.new(self.pub_key).verify(
-                SHA256.new(text.encode()),
+            self.sign_nodule.new(self.pub_key).verify(
+                SHA256.new(self.gen_sign_bytes(data)),
                 base64.b64decode(sign),
             )
             return True
@@ -153,7 +193,7 @@ class HashUtil:
     @staticmethod
     def md5_encode(s: str) -> str:
         """md5加密, 16进制."""
-        m = MD5.new(s.encode(encoding="utf-8"))
+        m = hashlib.md5(s.encode(encoding="utf-8"))  # noqa: S324
         return m.hexdigest()
 
     @staticmethod
@@ -164,7 +204,7 @@ class HashUtil:
     @staticmethod
     def sha1_encode(s: str) -> str:
         """sha1加密, 16进制."""
-        m = SHA1.new(s.encode(encoding="utf-8"))
+        m = hashlib.sha1(s.encode(encoding="utf-8"))  # noqa: S324
         return m.hexdigest()
 
 
@@ -216,18 +256,82 @@ class SignAuth:
     ) -> bool:
         """校验sign."""
         sign_tmp = self.generate_sign(data)
-        return sign == sign_tmp
+        return hmac.compare_digest(sign.encode(), sign_tmp.encode())
 
     def generate_sign(self, data: dict) -> str:
         """生成sign."""
         data_str = self.gen_data_str(data)
         return HashUtilB64.hmac_sha256_encode_b64(self.private_key, data_str)
 
+    def body_hmac(self, timestamp: str, nonce: str) -> hmac.HMAC:
+        """原始请求体签名: hex(hmac_sha256(key, "{timestamp}\\n{nonce}\\n" + body)), 请求体可分块 update"""
+        return hmac.new(self.private_key.encode(), f"{timestamp}\n{nonce}\n".encode(), "sha256")
+
+    def generate_body_sign(self, body: bytes, timestamp: str, nonce: str) -> str:
+        hasher = self.body_hmac(timestamp, nonce)
+        hasher.update(body)
+        return hasher.hexdigest()
+
+    @staticmethod
+    def verify_body_sign(sign: str, hasher: hmac.HMAC) -> bool:
+        return hmac.compare_digest(hasher.hexdigest().encode(), sign.encode())
+
 
 class PasswordUtil:
-    """密码工具."""
+    """密码工具.
+
+    bcrypt 计算耗时 100ms 以上, 异步环境使用 async_* 方法在独立线程池中执行(bcrypt 计算时释放 GIL)
+    """
+
+    pwd_context: "CryptContext | None" = None
+
+    max_workers: int = min(4, os.cpu_count() or 1)
+    _executor: ThreadPoolExecutor | None = None
+    _pending: int = 0
+    _completed: int = 0
+
+    @classmethod
+    def _get_pwd_context(cls) -> "CryptContext":
+        if cls.pwd_context is None:
+            from passlib.context import CryptContext  # type: ignore
+
+            cls.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        return cls.pwd_context
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=cls.max_workers,
+                thread_name_prefix="password-hash",
+            )
+        return cls._executor
+
+    @classmethod
+    async def _run_in_executor(cls, func: Callable[..., R], *args: Any) -> R:  # ruff: noqa: ANN401
+        cls._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls._get_executor(), func, *args)
+        finally:
+            cls._pending -= 1
+            cls._completed += 1
 
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    @classmethod
+    def executor_stats(cls) -> dict[str, int]:
+        """线程池状态: 执行中、排队中及已完成的任务数"""
+        running = min(cls._pending, cls.max_workers)
+        return {
+            "max_workers": cls.max_workers,
+            "running": running,
+            "queued": cls._pending - running,
+            "completed": cls._completed,
+        }
+
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
 
     @classmethod
     def verify_password(
@@ -235,11 +339,23 @@ class PasswordUtil:
         plain_password: str,
         hashed_password: str,
     ) -> bool:
-        return cls.pwd_context.verify(plain_password, hashed_password)  # type: ignore
+        return cls._get_pwd_context().verify(plain_password, hashed_password)  # type: ignore
 
     @classmethod
     def get_password_hash(cls, plain_password: str) -> str:
-        return cls.pwd_context.hash(plain_password)  # type: ignore
+        return cls._get_pwd_context().hash(plain_password)  # type: ignore
+
+    @classmethod
+    async def async_verify_password(
+        cls,
+        plain_password: str,
+        hashed_password: str,
+    ) -> bool:
+        return await cls._run_in_executor(cls.verify_password, plain_password, hashed_password)
+
+    @classmethod
+    async def async_get_password_hash(cls, plain_password: str) -> str:
+        return await cls._run_in_executor(cls.get_password_hash, plain_password)
 
 
 T = TypeVar("T", bound=BaseModel)
@@ -248,7 +364,7 @@ T = TypeVar("T", bound=BaseModel)
 class JwtUtil(Generic[T]):
     """jwt 工具."""
 
-    default_algorithm = constants.ALGORITHMS.RS256
+    default_algorithm = "RS256"  # jose.constants.ALGORITHMS.RS256
 
     def get_jwk_by_kid(kid, jwk_set: dict) -> dict | None:
         for key in jwk_set["keys"]:
@@ -268,6 +384,8 @@ class JwtUtil(Generic[T]):
         issuer: str | None = None,
         subject: str | None = None,
     ) -> T:
+        from jose import jwt
+
         payload = jwt.decode(
             token=token,
             key=key,
@@ -34,6 +34,7 @@ class ResponseHeaderKeyEnum(StrEnumMore):
 
     request_id = ("X-Request-Id", "请求唯一ID")
     process_time = ("X-Process-Time", "请求处理时间")  # ms
+    server_timing = ("Server-Timing", "后端调用耗时")
 
 
 @unique
@@ -43,6 +44,9 @@ class RequestHeaderKeyEnum(StrEnumMore):
     system_id = ("X-System-Id", "请求系统标识")
     front_scene = ("X-Front-Scene", "请求的系统标识")
     front_version = ("X-Front-Version", "版本号")
+    signature = ("X-Signature", "请求签名")
+    timestamp = ("X-Timestamp", "请求时间戳")
+    nonce = ("X-Nonce", "请求随机数")
 
 
 @unique
@@ -52,6 +56,7 @@ class InfoLoggerNameEnum(StrEnumMore):
     # 请求相关日志
     info_request_logger = ("_info.request", "请求数据统计日志")
     info_websocket_access_logger = ("_info.websocket.access", "websocket日志")
+    info_slow_query_logger = ("_info.slow_query", "慢查询日志")
 
 
 @unique
@@ -63,7 +68,20 @@ class ContextKeyEnum(StrEnumMore):
     request_start_timestamp = ("request_start_timestamp", "请求开始时间")
     request_body = ("request_body", "请求体")
     process_time = ("process_time", "请求处理时间/ms")
+    request_stats = ("request_stats", "后端调用统计")
 
     # custom
     response_code = ("response_code", "响应code")
     response_data = ("response_data", "响应数据")  #  只记录code != 0 的
+    db_primary_sticky = ("db_primary_sticky", "读主库")  # 请求内发生写入后置为True
+    pending_file_urls = ("pending_file_urls", "待签名的文件地址")
+
+
+@unique
+class BackendKindEnum(StrEnumMore):
+    """请求内统计的后端调用类型"""
+
+    db = ("db", "数据库")
+    redis = ("redis", "Redis")
+    clickhouse = ("clickhouse", "ClickHouse")
+    hbase = ("hbase", "HBase")
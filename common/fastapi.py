@@ -1,23 +1,35 @@
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from typing import Any, Self
+import os
+import hmac
+import time
+from abc import ABC
+from typing import Any, Self, Literal
 from inspect import isclass, isfunction
+from functools import partial
 from contextlib import asynccontextmanager
 from collections.abc import Callable, AsyncGenerator
 
 import loguru
 from fastapi import FastAPI, APIRouter
 from tortoise import Tortoise
-from fastapi.responses import HTMLResponse
+from fastapi.responses import Response, HTMLResponse, ORJSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.routing import Mount
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from common.log import LogLevelEnum, setup_loguru
+from common.log import LogLevelEnum, BufferedJsonSink, setup_loguru, access_log_limiter
 from conf.config import LocalConfig
-from common.utils import merge_dict
+from common.utils import Translator, merge_dict
 from common.responses import AesResponse
+from conf.defines import ConnectionNameEnum
+from common.permission import RoutePermissionTable, permission_matcher_cache
 from common.monkey_patch import patch
+from common.metrics import route_metrics, process_memory, render_histograms
+from common.health import health_checker
+from common.profiling import request_sampler
+from common.tortoise.contrib.pydantic.creator import precompute
+from common.tortoise.backends.mysql import warm_up_pools, acquire_wait_histograms
 
 
 class _ConfigRegistry:
@@ -61,9 +73,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     # tortoise
     await Tortoise.init(config=app.settings.relational.tortoise_orm_config)
+    await warm_up_pools()
+
+    # 挂载的子应用的 lifespan 不会执行, 在根应用中统一初始化
+    for service_api in app.service_apis():
+        service_api.setup_route_permission_table()
+    await health_checker.start()
+    permission_matcher_cache.start(partial(app.settings.redis.get_redis, ConnectionNameEnum.user_center))
+    app.report_worker_ready()
 
     yield
 
+    await permission_matcher_cache.stop()
+    await health_checker.stop()
     await Tortoise.close_connections()
 
 
@@ -71,6 +93,9 @@ class ServiceApi(FastAPI, ABC):
     code: str
     settings: LocalConfig
     logger: loguru.Logger
+    route_permission_table: RoutePermissionTable
+    worker_forked_at: float | None = None  # gunicorn post_fork 中设置
+    schema_packages: tuple[str, ...] = ()  # preload 时预先导入, 生成其中的 pydantic 模型
 
     _default_config = {
         "default_response_class": AesResponse,
@@ -79,11 +104,17 @@ class ServiceApi(FastAPI, ABC):
 
     def __init__(self, code: str, title: str, description: str, settings: LocalConfig, **kwargs) -> None:
         if not _ConfigRegistry.is_loguru_setup_done():
-            setup_loguru(LogLevelEnum.DEBUG if settings.project.debug else LogLevelEnum.INFO)
+            setup_loguru(
+                LogLevelEnum.DEBUG if settings.project.debug else LogLevelEnum.INFO,
+                sink=BufferedJsonSink.from_config(settings.project.log),
+            )
+            access_log_limiter.configure(settings.project.log.access_log_rate, settings.project.log.access_log_burst)
             _ConfigRegistry.set_loguru_setup_done()
         if not _ConfigRegistry.is_monkey_patch_done():
             patch()
             _ConfigRegistry.set_monkey_patch_done()
+        if settings.server.response_encryption:
+            AesResponse.enable_encryption(settings.server.response_encryption.secret)
         kwargs = merge_dict(kwargs, self._default_config)
         if "debug" not in kwargs:
             kwargs["debug"] = settings.project.debug
@@ -92,6 +123,7 @@ class ServiceApi(FastAPI, ABC):
         self.code = code
         self.settings = settings
         self.logger = loguru.logger.bind(code=self.code)
+        self.route_permission_table = RoutePermissionTable(self.code)
 
     def enable_sentry(self) -> None:
         if not self.settings.project.sentry_dsn:
@@ -145,14 +177,105 @@ class ServiceApi(FastAPI, ABC):
                         f"Require Class, Got Type {type(middle_fc[0])}",  # type: ignore
                     )
 
+    def setup_metrics_endpoint(self) -> None:
+        """Prometheus 文本格式的请求指标, 各 worker 进程分别统计, 需按实例/进程抓取"""
+        if not self.settings.server.metrics_uri:
+            return
+
+        async def metrics() -> Response:
+            lines = [
+                *route_metrics.render(),
+                *render_histograms(
+                    "db_pool_acquire_wait_seconds",
+                    "Time spent waiting for a database connection.",
+                    ("connection",),
+                    acquire_wait_histograms(),
+                ),
+            ]
+            return Response("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+        self.add_api_route(self.settings.server.metrics_uri, metrics, include_in_schema=False)
+
+    def setup_health_endpoints(self) -> None:
+        """存活/就绪探针, 依赖检查项通过 health_checker.register 注册, 由 lifespan 启动, 挂载时为根应用的 lifespan"""
+        config = self.settings.server.health
+        health_checker.configure(config.interval, config.timeout, config.stale_after)
+
+        async def livez() -> ORJSONResponse:
+            return ORJSONResponse({"status": "ok"})
+
+        async def readyz() -> ORJSONResponse:
+            return ORJSONResponse(health_checker.report(), status_code=200 if health_checker.is_ready() else 503)
+
+        self.add_api_route(config.livez_uri, livez, include_in_schema=False)
+        self.add_api_route(config.readyz_uri, readyz, include_in_schema=False)
+
+    def setup_profiling(self) -> None:
+        """
+        按 server.profiling.sample_rate 持续采样请求, 调用栈按路由模板聚合
+        GET {uri}?secret=..&format=collapsed|speedscope|routes&route=/xxx/{id}
+        (profile_secret 参数会触发中间件的单请求 profiling, 此处不使用)
+        """
+        config = self.settings.server.profiling
+        if not config:
+            return
+        request_sampler.configure(config.sample_rate, config.interval, config.max_concurrent, config.window)
+
+        async def profiling(
+            secret: str,
+            format: Literal["collapsed", "speedscope", "routes"] = "collapsed",  # noqa: A002
+            route: str | None = None,
+        ) -> Response:
+            if not hmac.compare_digest(secret.encode(), config.secret.encode()):
+                return PlainTextResponse("Forbidden", status_code=403)
+            if format == "routes":
+                return ORJSONResponse(request_sampler.stacks.routes())
+            if format == "speedscope":
+                return ORJSONResponse(request_sampler.stacks.speedscope(route))
+            return PlainTextResponse(request_sampler.stacks.collapsed(route))
+
+        self.add_api_route(config.uri, profiling, include_in_schema=False)
+
+    def setup_route_permission_table(self) -> None:
+        # 预计算路由权限编码, 鉴权时直接查表; 已在 master 中 preload 时不再重复构建
+        if len(self.route_permission_table):
+            return
+        self.route_permission_table.build(self, self.root_path)
+
+    def service_apis(self) -> list[ServiceApi]:
+        """自身及挂载的 ServiceApi 子应用"""
+        return [
+            self,
+            *(route.app for route in self.routes if isinstance(route, Mount) and isinstance(route.app, ServiceApi)),
+        ]
+
+    def preload(self) -> None:
+        """
+        fork 前在 master 中构建各 worker 只读的状态: pydantic 模型、OpenAPI 文档、路由权限表、翻译文件,
+        之后调用 gc.freeze(), 避免 worker 中的 gc 写入对象头导致共享内存页被复制
+        """
+        for app in self.service_apis():
+            if app.schema_packages:
+                models = precompute(app.schema_packages)
+                self.logger.info("Precomputed {} pydantic models", len(models))  # noqa: PLE1205
+            app.openapi()
+            app.setup_route_permission_table()
+        Translator.preload()
+
+    def report_worker_ready(self) -> None:
+        """worker 启动耗时(fork 至完成 lifespan 初始化)及内存"""
+        if self.worker_forked_at is None:
+            return
+        self.logger.info(  # noqa: PLE1205, loguru 占位符
+            "Worker {} ready in {:.3f}s, memory(KB): {}",
+            os.getpid(),
+            time.perf_counter() - self.worker_forked_at,
+            process_memory(),
+        )
+
     def setup_exception_handlers(
         self,
         roster: list[tuple[type[Exception], Callable[..., AesResponse | HTMLResponse | None]]],
     ) -> None:
         for exc, handler in roster:
             self.add_exception_handler(exc, handler)  # type: ignore
-
-    @abstractmethod
-    async def before_server_start(self) -> None:
-        # 生产环境启动前执行代码, 如数据库迁移等
-        raise NotImplementedError
@@ -0,0 +1,277 @@
+"""
+WKB 编解码及惰性解析的几何对象
+
+MySQL GEOMETRY 列的内部格式为 4 字节小端 SRID + WKB, 坐标固定为 经度(x)-纬度(y) 顺序,
+读写均直接使用该格式, 无需 ST_GeomFromGeoJSON/ST_AsWKB 等函数
+坐标解析为 array("d") 扁平存储, 仅在响应序列化时转换为 GeoJSON
+"""
+import sys
+import struct
+from array import array
+from typing import Any
+from collections.abc import Callable
+
+import orjson
+from pydantic import BaseModel, GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic_core import core_schema
+
+DEFAULT_SRID = 4326
+
+_GEOMETRY_TYPES = {
+    1: "Point",
+    2: "LineString",
+    3: "Polygon",
+    4: "MultiPoint",
+    5: "MultiLineString",
+    6: "MultiPolygon",
+    7: "GeometryCollection",
+}
+_GEOMETRY_TYPE_CODES = {v: k for k, v in _GEOMETRY_TYPES.items()}
+_MULTI_PART_TYPES = {
+    "MultiPoint": "Point",
+    "MultiLineString": "LineString",
+    "MultiPolygon": "Polygon",
+}
+
+_UINT_LE = struct.Struct("<I")
+_UINT_BE = struct.Struct(">I")
+_HEADER = struct.Struct("<BI")  # 字节序 + 类型, 编码统一使用小端
+_NATIVE_LITTLE = sys.byteorder == "little"
+
+
+def _read_doubles(buf: memoryview, offset: int, count: int, little: bool) -> tuple[array, int]:
+    coords = array("d")
+    end = offset + 8 * count
+    coords.frombytes(buf[offset:end])
+    if little != _NATIVE_LITTLE:
+        coords.byteswap()
+    return coords, end
+
+
+def _read_sequence(buf: memoryview, offset: int, little: bool) -> tuple[array, int]:
+    (count,) = (_UINT_LE if little else _UINT_BE).unpack_from(buf, offset)
+    return _read_doubles(buf, offset + 4, 2 * count, little)
+
+
+def decode_wkb(buf: bytes | memoryview, offset: int = 0) -> tuple[str, Any, int]:  # ruff: noqa: ANN401
+    """
+    解析 WKB, 返回 (类型, 坐标, 结束位置)
+    Point/LineString 的坐标为 array("d") [x1, y1, x2, y2, ...], Polygon 为环的列表,
+    Multi* 为各部分坐标的列表, GeometryCollection 为 (类型, 坐标) 的列表
+    """
+    buf = memoryview(buf)
+    little = buf[offset] == 1
+    (code,) = (_UINT_LE if little else _UINT_BE).unpack_from(buf, offset + 1)
+    offset += 5
+    geom_type = _GEOMETRY_TYPES.get(code)
+    if geom_type is None:
+        raise ValueError(f"Unsupported WKB geometry type {code}")
+    if geom_type == "Point":
+        coords, offset = _read_doubles(buf, offset, 2, little)
+        return geom_type, coords, offset
+    if geom_type == "LineString":
+        coords, offset = _read_sequence(buf, offset, little)
+        return geom_type, coords, offset
+
+    (count,) = (_UINT_LE if little else _UINT_BE).unpack_from(buf, offset)
+    offset += 4
+    parts: list = []
+    for _ in range(count):
+        if geom_type == "Polygon":
+            part, offset = _read_sequence(buf, offset, little)
+        else:
+            part_type, part, offset = decode_wkb(buf, offset)
+            if geom_type == "GeometryCollection":
+                part = (part_type, part)
+        parts.append(part)
+    return geom_type, parts, offset
+
+
+def _xy(position: Any) -> tuple[float, float]:  # ruff: noqa: ANN401
+    # 兼容 GeoDataType 的 {"lng": .., "lat": ..}
+    if isinstance(position, dict):
+        return position["lng"], position["lat"]
+    return position[0], position[1]
+
+
+def _flat(positions: Any) -> array:  # ruff: noqa: ANN401
+    if isinstance(positions, array):
+        return positions
+    return array("d", [v for position in positions for v in _xy(position)])
+
+
+def _write_doubles(coords: array, out: bytearray) -> None:
+    if not _NATIVE_LITTLE:
+        coords = array("d", coords)
+        coords.byteswap()
+    out += coords.tobytes()
+
+
+def _write_sequence(positions: Any, out: bytearray) -> None:  # ruff: noqa: ANN401
+    coords = _flat(positions)
+    out += _UINT_LE.pack(len(coords) // 2)
+    _write_doubles(coords, out)
+
+
+def encode_wkb(geom_type: str, coordinates: Any, out: bytearray | None = None) -> bytearray:  # ruff: noqa: ANN401
+    """按 GeoJSON 坐标结构(或 decode_wkb 的结果)编码为小端 WKB"""
+    out = bytearray() if out is None else out
+    code = _GEOMETRY_TYPE_CODES.get(geom_type)
+    if code is None:
+        raise ValueError(f"Unsupported geometry type {geom_type}")
+    out += _HEADER.pack(1, code)
+    if geom_type == "Point":
+        _write_doubles(coordinates if isinstance(coordinates, array) else array("d", _xy(coordinates)), out)
+    elif geom_type == "LineString":
+        _write_sequence(coordinates, out)
+    elif geom_type == "Polygon":
+        out += _UINT_LE.pack(len(coordinates))
+        for ring in coordinates:
+            _write_sequence(ring, out)
+    elif geom_type == "GeometryCollection":
+        out += _UINT_LE.pack(len(coordinates))
+        for part_type, part in coordinates:
+            encode_wkb(part_type, part, out)
+    else:
+        out += _UINT_LE.pack(len(coordinates))
+        for part in coordinates:
+            encode_wkb(_MULTI_PART_TYPES[geom_type], part, out)
+    return out
+
+
+def _positions(coords: array) -> list[list[float]]:
+    values = coords.tolist()
+    return [values[i : i + 2] for i in range(0, len(values), 2)]
+
+
+def _geojson_coordinates(geom_type: str, coords: Any) -> Any:  # ruff: noqa: ANN401
+    match geom_type:
+        case "Point":
+            return coords.tolist()
+        case "LineString":
+            return _positions(coords)
+        case "MultiPoint":
+            return [part.tolist() for part in coords]
+        case "Polygon" | "MultiLineString":
+            return [_positions(part) for part in coords]
+        case "MultiPolygon":
+            return [[_positions(ring) for ring in part] for part in coords]
+    raise ValueError(f"Unsupported geometry type {geom_type}")
+
+
+def _geojson(geom_type: str, coords: Any) -> dict:  # ruff: noqa: ANN401
+    if geom_type == "GeometryCollection":
+        return {"type": geom_type, "geometries": [_geojson(t, c) for t, c in coords]}
+    return {"type": geom_type, "coordinates": _geojson_coordinates(geom_type, coords)}
+
+
+def _collection_parts(data: dict) -> list[tuple[str, Any]]:
+    return [
+        (g["type"], _collection_parts(g) if g["type"] == "GeometryCollection" else g["coordinates"])
+        for g in data["geometries"]
+    ]
+
+
+class Geometry:
+    """
+    几何对象: SRID + WKB, 坐标首次访问时才解析
+    作为 pydantic 类型时可由 GeoJSON(dict/str)、GeoDataType、Geometry 或 MySQL 内部格式的 bytes 校验得到,
+    序列化输出 GeoJSON
+    """
+
+    __slots__ = ("srid", "wkb", "_decoded")
+
+    def __init__(self, wkb: bytes, srid: int = DEFAULT_SRID) -> None:
+        self.srid = srid
+        self.wkb = bytes(wkb)
+        self._decoded: tuple[str, Any] | None = None
+
+    @classmethod
+    def from_mysql(cls, value: bytes) -> "Geometry":
+        return cls(value[4:], int.from_bytes(value[:4], "little"))
+
+    def to_mysql(self) -> bytes:
+        return self.srid.to_bytes(4, "little") + self.wkb
+
+    @classmethod
+    def from_geojson(cls, data: dict | str, srid: int = DEFAULT_SRID) -> "Geometry":
+        if isinstance(data, str | bytes):
+            data = orjson.loads(data)
+        if data["type"] == "GeometryCollection":  # type: ignore
+            return cls(encode_wkb("GeometryCollection", _collection_parts(data)), srid)  # type: ignore
+        return cls(encode_wkb(data["type"], data["coordinates"]), srid)  # type: ignore
+
+    def _decode(self) -> tuple[str, Any]:
+        if self._decoded is None:
+            geom_type, coords, _ = decode_wkb(self.wkb)
+            self._decoded = (geom_type, coords)
+        return self._decoded
+
+    @property
+    def geom_type(self) -> str:
+        return self._decode()[0]
+
+    @property
+    def coordinates(self) -> Any:  # ruff: noqa: ANN401
+        """array("d") 形式的坐标, 结构见 decode_wkb"""
+        return self._decode()[1]
+
+    def to_geojson(self) -> dict:
+        return _geojson(*self._decode())
+
+    def transform(self, coordinate_transform: Callable) -> "Geometry":
+        """坐标系批量转换, 如 common.coordinate.wgs84_to_gcj02_batch"""
+        from common.coordinate import transform_nested
+
+        geojson = self.to_geojson()
+        if geojson["type"] != "GeometryCollection":
+            geojson["coordinates"] = transform_nested(geojson["coordinates"], coordinate_transform)
+        else:
+            geojson["geometries"] = [
+                Geometry.from_geojson(g, self.srid).transform(coordinate_transform).to_geojson()
+                for g in geojson["geometries"]
+            ]
+        return Geometry.from_geojson(geojson, self.srid)
+
+    @classmethod
+    def validate(cls, value: Any, srid: int = DEFAULT_SRID) -> "Geometry":  # ruff: noqa: ANN401
+        match value:
+            case Geometry():
+                return value
+            case bytes() | bytearray() | memoryview():
+                return cls.from_mysql(bytes(value))
+            case dict() | str():
+                return cls.from_geojson(value, srid)
+            case BaseModel():
+                return cls.from_geojson(value.model_dump(by_alias=True), srid)
+        raise ValueError(f"Invalid geometry value {value!r}")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda v: v.to_geojson(),
+                when_used="always",
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> dict:
+        return {
+            "type": "object",
+            "description": "GeoJSON",
+            "properties": {
+                "type": {"type": "string"},
+                "coordinates": {"type": "array", "items": {}},
+            },
+        }
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Geometry) and self.srid == other.srid and self.wkb == other.wkb
+
+    def __hash__(self) -> int:
+        return hash((self.srid, self.wkb))
+
+    def __repr__(self) -> str:
+        return f"Geometry(srid={self.srid}, wkb={len(self.wkb)}B)"
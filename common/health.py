@@ -0,0 +1,116 @@
+"""
+健康检查
+
+/livez 仅反映进程自身是否存活, 不访问任何依赖
+/readyz 返回后台按 interval 定期检查各依赖(MySQL/Redis/ClickHouse/HBase 等)的缓存结果, 探针请求本身不产生依赖访问
+每个 worker 进程独立检查
+"""
+import time
+import random
+import asyncio
+import contextlib
+from typing import Any
+from dataclasses import dataclass
+from collections.abc import Callable, Awaitable
+
+from loguru import logger
+
+CheckFunc = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class CheckResult:
+    ok: bool
+    latency: float  # 秒
+    checked_at: float  # time.time()
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "latency_ms": round(self.latency * 1000, 3),
+            "checked_at": self.checked_at,
+            "error": self.error,
+        }
+
+
+async def tcp_check(address: str, timeout: float = 3) -> None:
+    """host:port 可建立 TCP 连接"""
+    host, port = address.rsplit(":", 1)
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), timeout)
+    writer.close()
+    await writer.wait_closed()
+
+
+class HealthChecker:
+    """注册的检查项在后台按 interval 并发执行, 结果缓存供 readiness 探针读取"""
+
+    def __init__(self, interval: float = 10, timeout: float = 3, stale_after: float = 60) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after  # 结果超过该时长未更新(后台任务异常退出等)视为未就绪
+        self.checks: dict[str, CheckFunc] = {}
+        self.results: dict[str, CheckResult] = {}
+        self._task: asyncio.Task | None = None
+
+    def configure(self, interval: float, timeout: float, stale_after: float) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def register(self, name: str, check: CheckFunc) -> None:
+        self.checks[name] = check
+
+    async def _check(self, name: str, check: CheckFunc) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), self.timeout)
+            result = CheckResult(True, time.perf_counter() - start, time.time())
+        except Exception as e:
+            result = CheckResult(False, time.perf_counter() - start, time.time(), f"{type(e).__name__}: {e}")
+            previous = self.results.get(name)
+            if previous is None or previous.ok:
+                logger.warning(f"Health check {name} failed: {result.error}")
+        self.results[name] = result
+
+    async def run_once(self) -> None:
+        await asyncio.gather(*(self._check(name, check) for name, check in self.checks.items()))
+
+    async def _run(self) -> None:
+        # 随机错开各 worker 的检查时刻
+        await asyncio.sleep(random.uniform(0, self.interval))
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """先同步检查一次, 保证启动后即有结果"""
+        if self._task is not None:
+            return
+        await self.run_once()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def is_ready(self) -> bool:
+        now = time.time()
+        for name in self.checks:
+            result = self.results.get(name)
+            if result is None or not result.ok or now - result.checked_at > self.stale_after:
+                return False
+        return True
+
+    def report(self) -> dict:
+        return {
+            "status": "ok" if self.is_ready() else "unavailable",
+            "checks": {name: result.to_dict() for name, result in self.results.items() if name in self.checks},
+        }
+
+
+health_checker = HealthChecker()
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 import sys
+import time
+import atexit
 import logging
+import threading
 import traceback
 from enum import Enum
 from types import FrameType
-from typing import Any, TextIO, cast
+from typing import Any, Literal, TextIO, BinaryIO, cast
 from itertools import chain
+from collections import deque
 from collections.abc import Callable
 
 import loguru
+import orjson
 from loguru import logger
 from gunicorn import glogging  # type: ignore
 
 from common.types import IntEnumMore
-from conf.defines import ENVIRONMENT, EnvironmentEnum
+from conf.defines import ENVIRONMENT, LogConfig, EnvironmentEnum
 
 
 class LogLevelEnum(IntEnumMore):
@@ -117,11 +122,124 @@ def serialize(record: loguru.Record) -> dict:
     return log
 
 
+def dumps_record(record: loguru.Record) -> bytes:
+    return orjson.dumps(serialize(record), default=str)
+
+
 def json_sink(record: loguru.Record) -> None:  # from loguru import Message
-    serialized = serialize(record.record)  # type: ignore
-    if not serialized:
-        return
-    print(serialized)
+    sys.stdout.buffer.write(dumps_record(record.record) + b"\n")  # type: ignore
+    sys.stdout.flush()
+
+
+class BufferedJsonSink:
+    """JSON 日志 sink
+
+    记录序列化为 orjson bytes 后放入环形缓冲区, 由后台线程按条数或时间间隔批量写出;
+    缓冲区满时按 overflow_policy 丢弃最旧或最新的记录, 并记录丢弃数量
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO | None = None,
+        buffer_size: int = 8192,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow_policy: Literal["drop_oldest", "drop_newest"] = "drop_oldest",
+    ) -> None:
+        self.stream = stream or sys.stdout.buffer
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._buffer: deque[bytes] = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="json-log-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    @classmethod
+    def from_config(cls, config: LogConfig) -> BufferedJsonSink:
+        return cls(
+            buffer_size=config.buffer_size,
+            batch_size=config.batch_size,
+            flush_interval=config.flush_interval,
+            overflow_policy=config.overflow_policy,
+        )
+
+    def __call__(self, message: loguru.Message) -> None:
+        line = dumps_record(message.record)
+        with self._condition:
+            if len(self._buffer) >= self.buffer_size:
+                self.dropped += 1
+                if self.overflow_policy == "drop_newest":
+                    return
+                self._buffer.popleft()
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._stopped or len(self._buffer) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                batch = list(self._buffer)
+                self._buffer.clear()
+                stopped = self._stopped
+            if batch:
+                self._write(batch)
+            if stopped:
+                return
+
+    def _write(self, batch: list[bytes]) -> None:
+        batch.append(b"")
+        try:
+            self.stream.write(b"\n".join(batch))
+            self.stream.flush()
+        except (OSError, ValueError):
+            self.dropped += len(batch) - 1
+
+    def stop(self) -> None:
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+
+class RateLimiter:
+    """令牌桶限流, rate 为空时不限制"""
+
+    def __init__(self, rate: float | None = None, burst: int = 1) -> None:
+        self.configure(rate, burst)
+
+    def configure(self, rate: float | None, burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.suppressed = 0
+
+    def allow(self) -> bool:
+        if self.rate is None:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.suppressed += 1
+        return False
+
+
+# RequestProcessInfoPlugin 访问日志限流
+access_log_limiter = RateLimiter()
 
 
 class GunicornLogger(glogging.Logger):
@@ -166,7 +284,7 @@ def setup_loguru(
         format="{message}",  # 日志显示格式
         level=level,  # 日志级别
         enqueue=True,  # 默认是线程安全的，enqueue=True使得多进程安全
-        serialize=True,
+        serialize=not callable(sink),  # 可调用的 sink 自行序列化 record
         backtrace=True,
         diagnose=True,
         colorize=True,
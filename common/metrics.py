@@ -0,0 +1,217 @@
+import math
+import time
+import bisect
+import resource
+from typing import Any
+from collections import defaultdict
+from collections.abc import Sequence
+
+# 秒
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# 单个请求内的调用次数
+DEFAULT_COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """累积分桶直方图"""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        result = []
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(bound): count for bound, count in self.cumulative()},
+        }
+
+
+def process_memory() -> dict[str, int]:
+    """
+    当前进程内存/KB, Linux 下区分 shared(与 master 及其他 worker 共享的页) 与 private,
+    pss 为按共享进程数分摊后的实际占用
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            values = {
+                key: int(value.split()[0])
+                for key, value in (line.split(":", 1) for line in f if line.rstrip().endswith("kB"))
+            }
+    except OSError:
+        return {"max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "shared": values["Shared_Clean"] + values["Shared_Dirty"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+class RequestStats:
+    """单个请求内各后端的调用次数及累计耗时, 按 (类型, 连接名) 统计"""
+
+    __slots__ = ("scope", "start", "calls")
+
+    def __init__(self, scope: dict | None = None) -> None:
+        self.scope = scope
+        self.start = time.perf_counter()
+        self.calls: dict[tuple[str, str], list] = {}  # [次数, 秒]
+
+    def record(self, kind: str, name: str, duration: float, count: int = 1) -> None:
+        call = self.calls.get((kind, name))
+        if call is None:
+            self.calls[(kind, name)] = [count, duration]
+        else:
+            call[0] += count
+            call[1] += duration
+
+    def count(self, kind: str) -> int:
+        return sum(call[0] for (k, _), call in self.calls.items() if k == kind)
+
+    def summary(self) -> dict[str, dict]:
+        return {
+            f"{kind}.{name}" if name else kind: {"count": count, "ms": round(seconds * 1000, 3)}
+            for (kind, name), (count, seconds) in self.calls.items()
+        }
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f'{kind}{"-" + name if name else ""};dur={seconds * 1000:.3f};desc="{count}"'
+            for (kind, name), (count, seconds) in self.calls.items()
+        )
+
+
+def _escape(value: Any) -> str:  # ruff: noqa: ANN401
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True))
+
+
+def render_histograms(
+    name: str,
+    documentation: str,
+    label_names: Sequence[str],
+    series: dict[tuple, Histogram],
+) -> list[str]:
+    """Prometheus 文本格式"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} histogram"]
+    for label_values, histogram in series.items():
+        labels = _labels(label_names, label_values)
+        prefix = f"{labels}," if labels else ""
+        for bound, count in histogram.cumulative():
+            le = "+Inf" if math.isinf(bound) else repr(float(bound))
+            lines.append(f'{name}_bucket{{{prefix}le="{le}"}} {count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_counters(
+    name: str,
+    documentation: str,
+    label_names: Sequence[str],
+    series: dict[tuple, float],
+) -> list[str]:
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} counter"]
+    for label_values, value in series.items():
+        lines.append(f"{name}{{{_labels(label_names, label_values)}}} {value}")
+    return lines
+
+
+class RouteMetrics:
+    """
+    按 (method, 路由模板) 聚合的请求指标, 每个 worker 进程独立统计
+    未匹配到路由的请求归为 UNMATCHED_ROUTE, 避免标签基数膨胀
+    """
+
+    UNMATCHED_ROUTE = "<unmatched>"
+
+    def __init__(self) -> None:
+        self.requests: dict[tuple[str, str, int], int] = defaultdict(int)
+        self.latency: dict[tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.db_queries: dict[tuple[str, str], Histogram] = defaultdict(lambda: Histogram(DEFAULT_COUNT_BUCKETS))
+        self.backend_calls: dict[tuple[str, str, str, str], int] = defaultdict(int)
+        self.backend_seconds: dict[tuple[str, str, str, str], float] = defaultdict(float)
+
+    def observe(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        self.requests[(method, route, status)] += 1
+        self.latency[(method, route)].observe(duration)
+        db_queries = 0
+        for (kind, name), (count, seconds) in stats.calls.items():
+            self.backend_calls[(method, route, kind, name)] += count
+            self.backend_seconds[(method, route, kind, name)] += seconds
+            if kind == "db":
+                db_queries += count
+        self.db_queries[(method, route)].observe(db_queries)
+
+    def render(self) -> list[str]:
+        route_labels = ("method", "route")
+        backend_labels = ("method", "route", "kind", "name")
+        return [
+            *render_counters(
+                "http_requests_total",
+                "Total HTTP requests.",
+                ("method", "route", "status"),
+                self.requests,
+            ),
+            *render_histograms(
+                "http_request_duration_seconds",
+                "HTTP request latency.",
+                route_labels,
+                self.latency,
+            ),
+            *render_histograms(
+                "http_request_db_queries",
+                "Database queries per HTTP request.",
+                route_labels,
+                self.db_queries,
+            ),
+            *render_counters(
+                "http_request_backend_calls_total",
+                "Backend calls made while serving HTTP requests.",
+                backend_labels,
+                self.backend_calls,
+            ),
+            *render_counters(
+                "http_request_backend_seconds_total",
+                "Time spent in backend calls while serving HTTP requests.",
+                backend_labels,
+                self.backend_seconds,
+            ),
+        ]
+
+
+route_metrics = RouteMetrics()
@@ -1,3 +1,4 @@
+import time
 from typing import Any
 
 from fastapi import routing
@@ -8,11 +9,16 @@ from fastapi.routing import _prepare_response_content
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import ResponseValidationError
 from pymysql.converters import escape_item, escape_bytes_prefixed
+from pypika.terms import ValueWrapper
 from aiomysql.connection import Connection
 from tortoise.expressions import RawSQL
 from starlette.concurrency import run_in_threadpool
+from redis.asyncio.client import Redis, Pipeline
 
+from common.enums import BackendKindEnum
+from common.context import record_backend_call
 from common.responses import Resp, SpecialResp
+from common.tortoise.fields.base import resolve_pending_file_urls
 
 
 def validate(
@@ -61,6 +67,38 @@ def escape(self: Connection, obj: Any) -> Any:
     return escape_item(obj, self._charset)
 
 
+_get_value_sql = ValueWrapper.get_value_sql
+
+
+def get_value_sql(self: ValueWrapper, **kwargs) -> str:
+    # 过滤条件中的 bytes(如 BINARY(16) 的 UUID) 以十六进制字面量内联, 原实现会输出 str(bytes)
+    if isinstance(self.value, bytes):
+        return f"X'{self.value.hex()}'"
+    return _get_value_sql(self, **kwargs)
+
+
+_execute_command = Redis.execute_command
+_execute_pipeline = Pipeline.execute
+
+
+async def execute_command(self: Redis, *args, **options) -> Any:  # ruff: noqa: ANN401
+    # 计入请求内 redis 调用统计
+    start = time.perf_counter()
+    try:
+        return await _execute_command(self, *args, **options)
+    finally:
+        record_backend_call(BackendKindEnum.redis, "", time.perf_counter() - start)
+
+
+async def execute_pipeline(self: Pipeline, raise_on_error: bool = True) -> list:
+    count = len(self.command_stack)
+    start = time.perf_counter()
+    try:
+        return await _execute_pipeline(self, raise_on_error)
+    finally:
+        record_backend_call(BackendKindEnum.redis, "", time.perf_counter() - start, count)
+
+
 async def serialize_response(
     *,
     field: ModelField | None = None,
@@ -73,6 +111,8 @@ async def serialize_response(
     exclude_none: bool = False,
     is_coroutine: bool = True,
 ) -> Any:
+    # 本请求加载的 FileField 地址统一批量签名
+    await resolve_pending_file_urls()
     if isinstance(response_content, Resp | SpecialResp):
         # 兼容 Resp 和 PageResp
         value = response_content.model_dump(
@@ -142,4 +182,7 @@ def patch() -> None:
     # ValidationError loc 字段改为使用 title
     ModelField.validate = validate  # type: ignore
     Connection.escape = escape  # type: ignore
+    ValueWrapper.get_value_sql = get_value_sql  # type: ignore
     routing.serialize_response = serialize_response  # type: ignore
+    Redis.execute_command = execute_command  # type: ignore
+    Pipeline.execute = execute_pipeline  # type: ignore
@@ -1,5 +1,11 @@
+import os
 import time
 import random
+import asyncio
+from typing import Literal, BinaryIO
+from collections.abc import AsyncIterable, AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
 
 from common.utils import generate_random_string
 
@@ -97,3 +103,190 @@ class OssFile:
         expires: int | None = None,
     ) -> tuple[bool, str]:
         raise NotImplementedError
+
+
+class AsyncOssFile:
+    """
+    异步存储接口: 流式上传下载、分片并发上传(可断点续传)、范围读取
+    实现方只需提供以下原语, 组合逻辑由本类完成, 内存占用上限约为 part_size * (part_concurrency + 1)
+
+        upload_id = await oss.create_multipart_upload(path)
+        await oss.upload_file(path, local_path, upload_id=upload_id)  # 失败后以同一 upload_id 重试, 已上传分片跳过
+
+        return StreamingResponse(oss.get_object_stream(path))
+    """
+
+    part_size: int = 8 * 1024 * 1024  # S3 兼容存储要求除最后一片外不小于 5M
+    part_concurrency: int = 4
+    chunk_size: int = 256 * 1024
+
+    async def put_object(self, path: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def get_object_stream(
+        self,
+        path: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """按块读取 [start, end) 范围, end 为空时读到末尾"""
+        raise NotImplementedError
+
+    async def get_object_size(self, path: str) -> int:
+        raise NotImplementedError
+
+    async def exists_object(self, path: str) -> bool:
+        raise NotImplementedError
+
+    async def delete_object(self, path: str) -> None:
+        raise NotImplementedError
+
+    async def create_multipart_upload(self, path: str) -> str:
+        """返回 upload_id"""
+        raise NotImplementedError
+
+    async def upload_part(self, path: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """part_number 从 1 开始, 返回 etag"""
+        raise NotImplementedError
+
+    async def list_parts(self, path: str, upload_id: str) -> dict[int, str]:
+        """已上传的分片 {part_number: etag}"""
+        raise NotImplementedError
+
+    async def complete_multipart_upload(self, path: str, upload_id: str, parts: dict[int, str]) -> None:
+        raise NotImplementedError
+
+    async def abort_multipart_upload(self, path: str, upload_id: str) -> None:
+        raise NotImplementedError
+
+    async def read_range(self, path: str, start: int, end: int | None = None) -> bytes:
+        return b"".join([chunk async for chunk in self.get_object_stream(path, start, end)])
+
+    async def download_to_file(self, path: str, local_path: str) -> None:
+        f = await run_in_threadpool(open_binary, local_path, "wb")
+        try:
+            async for chunk in self.get_object_stream(path):
+                await run_in_threadpool(f.write, chunk)
+        finally:
+            await run_in_threadpool(f.close)
+
+    async def upload_stream(
+        self,
+        path: str,
+        chunks: AsyncIterable[bytes],
+        upload_id: str | None = None,
+    ) -> None:
+        """
+        流式上传, 不超过一个分片的数据直接 put_object
+        续传时需以相同内容的数据流重新调用, 已上传分片的数据会被读取并丢弃
+        """
+        parts = _split_parts(chunks, self.part_size)
+        if upload_id is None:
+            head: list[tuple[int, bytes]] = []
+            async for part in parts:
+                head.append(part)
+                if len(head) == 2:
+                    break
+            if len(head) < 2:
+                await self.put_object(path, head[0][1] if head else b"")
+                return
+            upload_id = await self.create_multipart_upload(path)
+            parts = _chain_parts(head, parts)
+        await self._upload_parts(path, upload_id, parts, await self.list_parts(path, upload_id))
+
+    async def upload_file(self, path: str, local_path: str, upload_id: str | None = None) -> None:
+        """上传本地文件, 续传时已上传分片不再读取"""
+        size = os.path.getsize(local_path)
+        if upload_id is None and size <= self.part_size:
+
+            def read() -> bytes:
+                with open(local_path, "rb") as f:
+                    return f.read()
+
+            await self.put_object(path, await run_in_threadpool(read))
+            return
+        if upload_id is None:
+            upload_id = await self.create_multipart_upload(path)
+        etags = await self.list_parts(path, upload_id)
+        await self._upload_parts(path, upload_id, _read_parts(local_path, size, self.part_size, set(etags)), etags)
+
+    async def _upload_parts(
+        self,
+        path: str,
+        upload_id: str,
+        parts: AsyncIterator[tuple[int, bytes]],
+        etags: dict[int, str],
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.part_concurrency)
+        tasks: set[asyncio.Task] = set()
+
+        async def upload(number: int, data: bytes) -> None:
+            try:
+                etags[number] = await self.upload_part(path, upload_id, number, data)
+            finally:
+                semaphore.release()
+
+        try:
+            async for number, data in parts:
+                if number in etags:
+                    continue
+                await semaphore.acquire()
+                tasks.add(asyncio.create_task(upload(number, data)))
+                # 尽早暴露失败的分片
+                done = {task for task in tasks if task.done()}
+                tasks -= done
+                for task in done:
+                    task.result()
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        await self.complete_multipart_upload(path, upload_id, dict(sorted(etags.items())))
+
+
+def open_binary(path: str | os.PathLike[str], mode: Literal["rb", "wb"]) -> BinaryIO:
+    """二进制方式打开本地文件, 供 run_in_threadpool 调用"""
+    return open(path, mode)  # noqa: SIM115
+
+
+async def _split_parts(chunks: AsyncIterable[bytes], part_size: int) -> AsyncIterator[tuple[int, bytes]]:
+    buffer = bytearray()
+    number = 1
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield number, bytes(buffer[:part_size])
+            del buffer[:part_size]
+            number += 1
+    if buffer:
+        yield number, bytes(buffer)
+
+
+async def _chain_parts(
+    head: list[tuple[int, bytes]],
+    parts: AsyncIterator[tuple[int, bytes]],
+) -> AsyncIterator[tuple[int, bytes]]:
+    for part in head:
+        yield part
+    async for part in parts:
+        yield part
+
+
+async def _read_parts(
+    local_path: str,
+    size: int,
+    part_size: int,
+    skip: set[int],
+) -> AsyncIterator[tuple[int, bytes]]:
+    def read(offset: int) -> bytes:
+        with open(local_path, "rb") as f:
+            f.seek(offset)
+            return f.read(part_size)
+
+    for number, offset in enumerate(range(0, max(size, 1), part_size), 1):
+        if number in skip:
+            continue
+        yield number, await run_in_threadpool(read, offset)
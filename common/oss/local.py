@@ -0,0 +1,127 @@
+"""
+本地目录实现的 AsyncOssFile, 用于开发环境及测试替代对象存储
+
+    oss = LocalOss("/tmp/oss")
+    await oss.upload_stream("export/orders.csv", rows_to_csv_chunks())
+    async for chunk in oss.get_object_stream("export/orders.csv", start=1024):
+        ...
+"""
+import os
+import uuid
+import shutil
+import hashlib
+from pathlib import Path
+from collections.abc import AsyncIterator
+
+from starlette.concurrency import run_in_threadpool
+
+from common.oss.file import AsyncOssFile, open_binary
+
+MULTIPART_DIR = ".multipart"
+
+
+class LocalOss(AsyncOssFile):
+    def __init__(
+        self,
+        root: str,
+        part_size: int | None = None,
+        part_concurrency: int | None = None,
+    ) -> None:
+        self.root = Path(root).resolve()
+        if part_size:
+            self.part_size = part_size
+        if part_concurrency:
+            self.part_concurrency = part_concurrency
+
+    def local_path(self, path: str) -> Path:
+        local_path = (self.root / path.lstrip("/")).resolve()
+        if not local_path.is_relative_to(self.root) or local_path == self.root:
+            raise ValueError(f"Invalid path {path}")
+        return local_path
+
+    def _upload_dir(self, upload_id: str) -> Path:
+        return self.root / MULTIPART_DIR / uuid.UUID(upload_id).hex
+
+    @staticmethod
+    def _write(local_path: Path, data: bytes) -> None:
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换, 避免读到写了一半的文件
+        tmp_path = local_path.with_name(f".{local_path.name}.{uuid.uuid4().hex}")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, local_path)
+
+    async def put_object(self, path: str, data: bytes) -> None:
+        await run_in_threadpool(self._write, self.local_path(path), data)
+
+    async def get_object_stream(
+        self,
+        path: str,
+        start: int = 0,
+        end: int | None = None,
+        chunk_size: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        chunk_size = chunk_size or self.chunk_size
+        f = await run_in_threadpool(open_binary, self.local_path(path), "rb")
+        try:
+            await run_in_threadpool(f.seek, start)
+            remain = None if end is None else max(end - start, 0)
+            while remain is None or remain > 0:
+                chunk = await run_in_threadpool(f.read, chunk_size if remain is None else min(chunk_size, remain))
+                if not chunk:
+                    break
+                if remain is not None:
+                    remain -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def get_object_size(self, path: str) -> int:
+        return (await run_in_threadpool(self.local_path(path).stat)).st_size
+
+    async def exists_object(self, path: str) -> bool:
+        return await run_in_threadpool(self.local_path(path).is_file)
+
+    async def delete_object(self, path: str) -> None:
+        await run_in_threadpool(self.local_path(path).unlink, True)
+
+    async def create_multipart_upload(self, path: str) -> str:
+        upload_id = str(uuid.uuid4())
+        upload_dir = self._upload_dir(upload_id)
+        await run_in_threadpool(upload_dir.mkdir, 0o777, True)
+        await run_in_threadpool((upload_dir / "path").write_text, path)
+        return upload_id
+
+    async def upload_part(self, path: str, upload_id: str, part_number: int, data: bytes) -> str:
+        await run_in_threadpool(self._write, self._upload_dir(upload_id) / f"{part_number:05d}", data)
+        return hashlib.md5(data).hexdigest()  # noqa: S324
+
+    async def list_parts(self, path: str, upload_id: str) -> dict[int, str]:
+        def list_parts() -> dict[int, str]:
+            upload_dir = self._upload_dir(upload_id)
+            if not upload_dir.is_dir():
+                raise FileNotFoundError(f"Multipart upload {upload_id} not found")
+            return {
+                int(part.name): hashlib.md5(part.read_bytes()).hexdigest()  # noqa: S324
+                for part in sorted(upload_dir.iterdir())
+                if part.name.isdigit()
+            }
+
+        return await run_in_threadpool(list_parts)
+
+    async def complete_multipart_upload(self, path: str, upload_id: str, parts: dict[int, str]) -> None:
+        def complete() -> None:
+            upload_dir = self._upload_dir(upload_id)
+            local_path = self.local_path(path)
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = local_path.with_name(f".{local_path.name}.{upload_id}")
+            with open(tmp_path, "wb") as f:
+                for part_number in sorted(parts):
+                    with open(upload_dir / f"{part_number:05d}", "rb") as part:
+                        shutil.copyfileobj(part, f)
+            os.replace(tmp_path, local_path)
+            shutil.rmtree(upload_dir)
+
+        await run_in_threadpool(complete)
+
+    async def abort_multipart_upload(self, path: str, upload_id: str) -> None:
+        await run_in_threadpool(shutil.rmtree, self._upload_dir(upload_id), True)
@@ -0,0 +1,132 @@
+import asyncio
+from contextlib import AbstractAsyncContextManager, suppress
+from collections.abc import Callable, Hashable, Iterable
+
+from loguru import logger
+from fastapi import FastAPI
+from cachetools import TTLCache
+from redis.asyncio import Redis
+from starlette.routing import WebSocketRoute
+
+from common.utils import gte_all_uris
+
+ALL_PERMISSION_CODE = "*"
+PERMISSION_INVALIDATION_CHANNEL = "PermissionInvalidation"  # 消息为逗号分隔的账户id
+
+
+def route_permission_code(app_code: str, method: str, path: str) -> str:
+    """接口权限编码: {app_code}:{method}:{path}"""
+    return f"{app_code}:{method}:{path}"
+
+
+class PermissionMatcher:
+    """预编译的权限集合
+
+    通配规则:
+        *               全部权限
+        {app_code}:*    某个服务下的全部接口
+        {app_code}:{method}:{path}  单个接口
+    """
+
+    __slots__ = ("codes", "is_all", "app_wildcards")
+
+    def __init__(self, codes: Iterable[str]) -> None:
+        self.codes = frozenset(codes)
+        self.is_all = ALL_PERMISSION_CODE in self.codes
+        self.app_wildcards = frozenset(code[:-2] for code in self.codes if code.endswith(":*"))
+
+    def match(self, app_code: str, route_code: str) -> bool:
+        return self.is_all or app_code in self.app_wildcards or route_code in self.codes
+
+
+class RoutePermissionTable:
+    """服务路由到权限编码的映射, 启动时预计算, 挂载前缀不同的路由在首次访问时补全"""
+
+    app_code: str
+    _codes: dict[tuple[str, str, str], str]
+
+    def __init__(self, app_code: str) -> None:
+        self.app_code = app_code
+        self._codes = {}
+
+    def build(self, app: FastAPI, root_path: str = "") -> None:
+        for uri in gte_all_uris(app, lambda route: not isinstance(route, WebSocketRoute)):
+            self._codes[(root_path, uri["method"], uri["path"])] = route_permission_code(
+                self.app_code,
+                uri["method"],
+                f"{root_path}{uri['path']}",
+            )
+
+    def get(self, root_path: str, method: str, path: str) -> str:
+        key = (root_path, method, path)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = route_permission_code(self.app_code, method, f"{root_path}{path}")
+        return code
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+class PermissionMatcherCache:
+    """
+    按账户缓存已编译的权限集合, 鉴权时只查内存
+    权限变更时调用 invalidate, 经 redis pub/sub 通知各 worker 丢弃对应缓存;
+    订阅(重新)建立时清空本地缓存, 断开期间错过的通知由 ttl 兜底
+    """
+
+    def __init__(self, channel: str, maxsize: int = 1024, ttl: float = 60 * 10, retry_interval: float = 5) -> None:
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self._matchers: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._task: asyncio.Task | None = None
+
+    def get(self, account_id: Hashable) -> PermissionMatcher | None:
+        return self._matchers.get(str(account_id))
+
+    def set(self, account_id: Hashable, matcher: PermissionMatcher) -> None:
+        self._matchers[str(account_id)] = matcher
+
+    def discard(self, account_ids: Iterable[Hashable]) -> None:
+        for account_id in account_ids:
+            self._matchers.pop(str(account_id), None)
+
+    async def invalidate(self, redis: Redis, account_ids: Iterable[Hashable]) -> None:
+        ids = [str(account_id) for account_id in account_ids]
+        if not ids:
+            return
+        self.discard(ids)
+        await redis.publish(self.channel, ",".join(ids))
+
+    async def _listen(self, get_redis: Callable[[], AbstractAsyncContextManager[Redis]]) -> None:
+        while True:
+            try:
+                async with get_redis() as r, r.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    self._matchers.clear()
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.discard(_decode(message["data"]).split(","))
+            except Exception as e:
+                logger.warning(f"Permission invalidation subscription lost: {e}")
+                self._matchers.clear()
+                await asyncio.sleep(self.retry_interval)
+
+    def start(self, get_redis: Callable[[], AbstractAsyncContextManager[Redis]]) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(get_redis))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+
+def _decode(data: str | bytes) -> str:
+    return data.decode() if isinstance(data, bytes) else data
+
+
+permission_matcher_cache = PermissionMatcherCache(PERMISSION_INVALIDATION_CHANNEL)
@@ -0,0 +1,168 @@
+"""
+请求采样 profiling
+
+按 sample_rate 随机对请求启用 pyinstrument, 调用栈以 collapsed stacks("f1;f2;f3 耗时")形式
+按路由模板聚合到滚动时间窗口内, 可导出 collapsed(flamegraph.pl/speedscope 均可导入)或 speedscope 格式
+采样请求仍正常返回响应, 每个 worker 进程独立聚合
+"""
+import time
+import random
+from typing import Any
+from collections import deque, defaultdict
+
+from pyinstrument import Profiler
+
+SELF_FRAME = "[self]"
+
+
+def collapsed_stacks(profiler: Profiler) -> dict[str, float]:
+    """{调用栈: 自身耗时/秒}"""
+    session = profiler.last_session
+    root = session.root_frame() if session else None
+    stacks: dict[str, float] = defaultdict(float)
+    if root is None:
+        return stacks
+    pending: list[tuple[Any, str]] = [(root, "")]
+    while pending:
+        frame, prefix = pending.pop()
+        if frame.function == SELF_FRAME:
+            # pyinstrument 5 以 [self] 子节点表示自身耗时
+            path = prefix
+        else:
+            name = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+            path = f"{prefix};{name}" if prefix else name
+        self_time = frame.time - sum(child.time for child in frame.children)
+        if self_time > 0:
+            stacks[path] += self_time
+        pending.extend((child, path) for child in frame.children)
+    return stacks
+
+
+class RollingStacks:
+    """按 slot_seconds 分片的滚动窗口, 查询时合并窗口内的分片"""
+
+    def __init__(self, window: int = 600, slot_seconds: int = 60, max_stacks: int = 5000) -> None:
+        self.window = window
+        self.slot_seconds = slot_seconds
+        self.max_stacks = max_stacks  # 每个分片每个路由最多保留的调用栈数
+        self.slots: deque[tuple[int, dict[str, dict[str, float]]]] = deque()
+
+    def _expire(self, now: float) -> None:
+        oldest = int((now - self.window) // self.slot_seconds)
+        while self.slots and self.slots[0][0] <= oldest:
+            self.slots.popleft()
+
+    def add(self, route: str, stacks: dict[str, float]) -> None:
+        now = time.time()
+        self._expire(now)
+        slot = int(now // self.slot_seconds)
+        if not self.slots or self.slots[-1][0] != slot:
+            self.slots.append((slot, {}))
+        route_stacks = self.slots[-1][1].setdefault(route, defaultdict(float))
+        for stack, seconds in stacks.items():
+            if stack in route_stacks or len(route_stacks) < self.max_stacks:
+                route_stacks[stack] += seconds
+
+    def routes(self) -> list[str]:
+        self._expire(time.time())
+        return sorted({route for _, routes in self.slots for route in routes})
+
+    def merged(self, route: str | None = None) -> dict[str, dict[str, float]]:
+        """{路由: {调用栈: 秒}}, route 为空时返回全部路由"""
+        self._expire(time.time())
+        result: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for _, routes in self.slots:
+            for name, stacks in routes.items():
+                if route is not None and name != route:
+                    continue
+                merged = result[name]
+                for stack, seconds in stacks.items():
+                    merged[stack] += seconds
+        return result
+
+    def collapsed(self, route: str | None = None) -> str:
+        """每行 "路由;f1;f2 微秒", 指定 route 时省略路由前缀"""
+        lines = []
+        for name, stacks in self.merged(route).items():
+            for stack, seconds in stacks.items():
+                weight = round(seconds * 1_000_000)
+                if weight:
+                    lines.append(f"{stack if route else name + ';' + stack} {weight}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, route: str | None = None) -> dict:
+        """speedscope 文件格式, 每个路由一个 sampled profile"""
+        frames: list[dict] = []
+        frame_index: dict[str, int] = {}
+        profiles = []
+        for name, stacks in self.merged(route).items():
+            samples, weights = [], []
+            for stack, seconds in stacks.items():
+                weight = round(seconds * 1_000_000)
+                if not weight:
+                    continue
+                sample = []
+                for frame in stack.split(";"):
+                    index = frame_index.get(frame)
+                    if index is None:
+                        index = frame_index[frame] = len(frames)
+                        frames.append({"name": frame})
+                    sample.append(index)
+                samples.append(sample)
+                weights.append(weight)
+            profiles.append(
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "microseconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                },
+            )
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+            "name": route or "all routes",
+        }
+
+
+class RequestSampler:
+    """按比例采样请求, 同时进行 profiling 的请求数不超过 max_concurrent"""
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        interval: float = 0.001,
+        max_concurrent: int = 2,
+        stacks: RollingStacks | None = None,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.stacks = stacks or RollingStacks()
+        self.active = 0
+
+    def configure(self, sample_rate: float, interval: float, max_concurrent: int, window: int) -> None:
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.stacks.window = window
+
+    def start(self) -> Profiler | None:
+        if self.sample_rate <= 0 or self.active >= self.max_concurrent or random.random() >= self.sample_rate:
+            return None
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        self.active += 1
+        return profiler
+
+    def stop(self, profiler: Profiler, route: str) -> None:
+        self.active -= 1
+        profiler.stop()
+        self.stacks.add(route, collapsed_stacks(profiler))
+
+
+request_sampler = RequestSampler()
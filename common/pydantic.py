@@ -4,6 +4,7 @@ from datetime import datetime
 from collections.abc import Callable
 
 import pydantic
+from cachetools import LRUCache
 
 from common.utils import DATETIME_FORMAT_STRING
 from common.tortoise.contrib.pydantic.creator import PydanticModel
@@ -25,10 +26,18 @@ def optional(*fields: str) -> Callable[[type[pydantic.BaseModel]], type[pydantic
     return dec
 
 
+# 按请求字段生成的子模型缓存, key 只包含模型中实际存在的字段; 字段组合由客户端决定, 限制容量
+_SUB_FIELDS_MODELS: LRUCache = LRUCache(maxsize=1024)
+
+
 def create_sub_fields_model(
     base_model: type[pydantic.BaseModel] | type[PydanticModel],
     fields: set[str],
 ) -> type[pydantic.BaseModel] | type[PydanticModel]:
+    key = (base_model, frozenset(base_model.model_fields.keys() & fields))
+    cached: type[pydantic.BaseModel] | None = _SUB_FIELDS_MODELS.get(key)
+    if cached is not None:
+        return cached
     model_fields = {}
 
     for field_name, field in base_model.model_fields.items():
@@ -43,6 +52,7 @@ def create_sub_fields_model(
 
     for k, v in base_model.model_config.items():
         sub_model.model_config[k] = v
+    _SUB_FIELDS_MODELS[key] = sub_model
     return sub_model
 
 
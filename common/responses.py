@@ -1,6 +1,6 @@
 # ruff: noqa: RET504
 from math import ceil
-from typing import Self, Generic, TypeVar
+from typing import Self, Generic, TypeVar, ClassVar
 from datetime import datetime
 from collections.abc import Sequence
 
@@ -17,6 +17,7 @@ from fastapi.responses import ORJSONResponse
 from starlette_context import context
 
 from common.enums import ResponseCodeEnum
+from common.encrypt import AESUtil
 from common.utils import DATEMINUTE_FORMAT_STRING, datetime_now
 from common.context import ContextKeyEnum
 from common.schemas import Pager, CRUDPager
@@ -24,13 +25,15 @@ from common.pydantic import CommonConfigDict
 
 
 class AesResponse(ORJSONResponse):
-    pass
+    # 配置后对响应体进行AES加密
+    cipher: ClassVar[AESUtil | None] = None
+
+    @classmethod
+    def enable_encryption(cls, key: str) -> None:
+        cls.cipher = AESUtil(key)
 
     def render(self, content: dict) -> bytes:
         """AES加密响应体"""
-        # if not get_settings().DEBUG:
-        # content = AESUtil(local_configs.AES.SECRET).encrypt_data(
-        #       orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS).decode())
         if isinstance(content, str):
             dump_content = content.encode()
 
@@ -40,6 +43,10 @@ class AesResponse(ORJSONResponse):
                 option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME,
             )
 
+        if self.cipher is not None:
+            # 直接加密 orjson 输出的 bytes, 不经过 str 中转
+            return self.cipher.encrypt_bytes(dump_content)
+
         return dump_content
 
 
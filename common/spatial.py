@@ -0,0 +1,169 @@
+"""
+进程内围栏索引: STR 批量构建的 R-tree 外包矩形过滤 + 射线法点面判断
+
+    fence_cache = FenceCache(load_fences, ttl=60)
+
+    async def load_fences() -> list[tuple[Hashable, Geometry]]:
+        return [(f.id, f.geo_data) for f in await Fence.filter(enabled=True)]
+
+    fence_ids = await fence_cache.query(lng, lat)
+"""
+import math
+import time
+import asyncio
+from array import array
+from typing import Any, Generic, TypeVar
+from collections.abc import Hashable, Iterable, Callable, Awaitable
+
+from common.geometry import Geometry
+
+KT = TypeVar("KT", bound=Hashable)
+
+BBox = tuple[float, float, float, float]  # min_x, min_y, max_x, max_y
+
+
+def _ring_bbox(ring: array) -> BBox:
+    xs, ys = ring[0::2], ring[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _point_in_ring(x: float, y: float, ring: array) -> bool:
+    inside = False
+    count = len(ring) // 2
+    xj, yj = ring[2 * count - 2], ring[2 * count - 1]
+    for i in range(count):
+        xi, yi = ring[2 * i], ring[2 * i + 1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        xj, yj = xi, yi
+    return inside
+
+
+def _point_in_polygon(x: float, y: float, rings: list[array]) -> bool:
+    # 第一个为外环, 其余为洞
+    if not rings or not _point_in_ring(x, y, rings[0]):
+        return False
+    return not any(_point_in_ring(x, y, hole) for hole in rings[1:])
+
+
+def _polygons(geometry: Geometry) -> list[list[array]]:
+    match geometry.geom_type:
+        case "Polygon":
+            return [geometry.coordinates]
+        case "MultiPolygon":
+            return geometry.coordinates
+    raise ValueError(f"Fence geometry must be Polygon or MultiPolygon, got {geometry.geom_type}")
+
+
+class _Node:
+    __slots__ = ("bbox", "children", "leaf")
+
+    def __init__(self, bbox: BBox, children: list, leaf: bool) -> None:
+        self.bbox = bbox
+        self.children = children
+        self.leaf = leaf
+
+
+def _merge_bbox(boxes: Iterable[BBox]) -> BBox:
+    min_x, min_y, max_x, max_y = math.inf, math.inf, -math.inf, -math.inf
+    for box in boxes:
+        min_x, min_y = min(min_x, box[0]), min(min_y, box[1])
+        max_x, max_y = max(max_x, box[2]), max(max_y, box[3])
+    return min_x, min_y, max_x, max_y
+
+
+def _str_pack(items: list[tuple[BBox, Any]], capacity: int) -> list[tuple[BBox, list]]:
+    """Sort-Tile-Recursive: 按 x 中心切片, 片内按 y 中心分组, 每组不超过 capacity"""
+    items = sorted(items, key=lambda i: i[0][0] + i[0][2])
+    slice_count = math.ceil(math.sqrt(math.ceil(len(items) / capacity)))
+    slice_size = slice_count * capacity
+    groups = []
+    for start in range(0, len(items), slice_size):
+        vertical = sorted(items[start : start + slice_size], key=lambda i: i[0][1] + i[0][3])
+        for group_start in range(0, len(vertical), capacity):
+            group = vertical[group_start : group_start + capacity]
+            groups.append((_merge_bbox(box for box, _ in group), group))
+    return groups
+
+
+class FenceIndex(Generic[KT]):
+    """不可变的围栏索引, 更新时整体重建"""
+
+    def __init__(self, fences: Iterable[tuple[KT, Geometry]], node_capacity: int = 16) -> None:
+        entries: list[tuple[BBox, tuple[KT, list[array]]]] = []
+        for key, geometry in fences:
+            for polygon in _polygons(geometry):
+                if polygon:
+                    entries.append((_ring_bbox(polygon[0]), (key, polygon)))
+        self.size = len(entries)
+        self.root: _Node | None = None
+        if not entries:
+            return
+        # 叶子节点的 children 为 (外包矩形, (key, 多边形))
+        nodes = [_Node(bbox, group, True) for bbox, group in _str_pack(entries, node_capacity)]
+        while len(nodes) > 1:
+            nodes = [
+                _Node(bbox, [node for _, node in group], False)
+                for bbox, group in _str_pack([(node.bbox, node) for node in nodes], node_capacity)
+            ]
+        self.root = nodes[0]
+
+    def candidates(self, x: float, y: float) -> list[tuple[KT, list[array]]]:
+        """外包矩形包含该点的多边形"""
+        result: list[tuple[KT, list[array]]] = []
+        if self.root is None:
+            return result
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            min_x, min_y, max_x, max_y = node.bbox
+            if x < min_x or x > max_x or y < min_y or y > max_y:
+                continue
+            if not node.leaf:
+                stack.extend(node.children)
+                continue
+            for (min_x, min_y, max_x, max_y), item in node.children:
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    result.append(item)
+        return result
+
+    def query(self, lng: float, lat: float) -> list[KT]:
+        """包含该点的围栏, 按 key 去重"""
+        keys: dict[KT, None] = {}
+        for key, polygon in self.candidates(lng, lat):
+            if key not in keys and _point_in_polygon(lng, lat, polygon):
+                keys[key] = None
+        return list(keys)
+
+
+class FenceCache(Generic[KT]):
+    """定时重建的 FenceIndex, 并发请求只触发一次加载"""
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[Iterable[tuple[KT, Geometry]]]],
+        ttl: float = 60,
+        node_capacity: int = 16,
+    ) -> None:
+        self.loader = loader
+        self.ttl = ttl
+        self.node_capacity = node_capacity
+        self._index: FenceIndex[KT] | None = None
+        self._expire_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get_index(self) -> FenceIndex[KT]:
+        if self._index is not None and time.monotonic() < self._expire_at:
+            return self._index
+        async with self._lock:
+            if self._index is None or time.monotonic() >= self._expire_at:
+                self._index = FenceIndex(await self.loader(), self.node_capacity)
+                self._expire_at = time.monotonic() + self.ttl
+        return self._index
+
+    async def query(self, lng: float, lat: float) -> list[KT]:
+        return (await self.get_index()).query(lng, lat)
+
+    def invalidate(self) -> None:
+        """围栏变更后调用, 下次查询时重建"""
+        self._expire_at = 0.0
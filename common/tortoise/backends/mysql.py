@@ -0,0 +1,124 @@
+"""Tortoise MySQL 引擎: engine = "common.tortoise.backends.mysql"
+
+在原生 MySQLClient 基础上记录慢查询、请求内查询次数/耗时及连接池状态
+"""
+import time
+from typing import Any
+
+from tortoise import connections
+from tortoise.backends.mysql import client
+
+from common.enums import BackendKindEnum
+from common.context import record_backend_call
+from common.metrics import Histogram
+from common.tortoise.slow_query import slow_query_recorder
+
+
+class QueryRecorderMixin:
+    connection_name: str
+    slow_query_threshold: float | None  # 秒, 为空时不记录
+
+    def _record_query(self, query: str, start: float, rowcount: int | None) -> None:
+        duration = time.perf_counter() - start
+        record_backend_call(BackendKindEnum.db, self.connection_name, duration)
+        if self.slow_query_threshold is not None and duration >= self.slow_query_threshold:
+            slow_query_recorder.record(self.connection_name, query, duration, rowcount)
+
+    async def execute_insert(self, query: str, values: list) -> int:
+        start = time.perf_counter()
+        result = await super().execute_insert(query, values)  # type: ignore
+        self._record_query(query, start, 1)
+        return result
+
+    async def execute_many(self, query: str, values: list) -> None:
+        start = time.perf_counter()
+        await super().execute_many(query, values)  # type: ignore
+        self._record_query(query, start, len(values))
+
+    async def execute_query(self, query: str, values: list | None = None) -> tuple[int, list[dict]]:
+        start = time.perf_counter()
+        rowcount, rows = await super().execute_query(query, values)  # type: ignore
+        self._record_query(query, start, rowcount)
+        return rowcount, rows
+
+    async def execute_script(self, query: str) -> None:
+        start = time.perf_counter()
+        await super().execute_script(query)  # type: ignore
+        self._record_query(query, start, None)
+
+
+class _TimedAcquire:
+    """记录从连接池获取连接的等待时间"""
+
+    __slots__ = ("client", "wrapper")
+
+    def __init__(self, client: "MySQLClient", wrapper: Any) -> None:  # ruff: noqa: ANN401
+        self.client = client
+        self.wrapper = wrapper
+
+    async def __aenter__(self) -> Any:  # ruff: noqa: ANN401
+        start = time.perf_counter()
+        connection = await self.wrapper.__aenter__()
+        self.client.acquire_wait.observe(time.perf_counter() - start)
+        return connection
+
+    async def __aexit__(self, *args) -> Any:  # ruff: noqa: ANN401
+        return await self.wrapper.__aexit__(*args)
+
+
+class MySQLClient(QueryRecorderMixin, client.MySQLClient):
+    def __init__(self, *args, slow_query_threshold: float | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.slow_query_threshold = slow_query_threshold
+        self.acquire_wait = Histogram()
+
+    def acquire_connection(self) -> Any:  # ruff: noqa: ANN401
+        return _TimedAcquire(self, super().acquire_connection())
+
+    def pool_stats(self) -> dict:
+        pool = self._pool
+        size = pool.size if pool else 0
+        idle = pool.freesize if pool else 0
+        return {
+            "minsize": self.pool_minsize,
+            "maxsize": self.pool_maxsize,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "acquire_wait": self.acquire_wait.snapshot(),
+        }
+
+    def _in_transaction(self) -> Any:  # ruff: noqa: ANN401
+        context = super()._in_transaction()
+        context.connection = TransactionWrapper(self)
+        return context
+
+
+class TransactionWrapper(QueryRecorderMixin, client.TransactionWrapper):
+    def __init__(self, connection: MySQLClient) -> None:
+        super().__init__(connection)
+        self.slow_query_threshold = connection.slow_query_threshold
+
+
+client_class = MySQLClient
+
+
+def pool_stats() -> dict[str, dict]:
+    """各连接的连接池状态: 使用中/空闲连接数及获取连接等待时间分布"""
+    return {
+        conn.connection_name: conn.pool_stats() for conn in connections.all() if isinstance(conn, MySQLClient)
+    }
+
+
+async def warm_up_pools() -> None:
+    """创建连接池并建立 minsize 个连接, 避免 worker 重启后首批请求承担建连耗时"""
+    for conn in connections.all():
+        if isinstance(conn, MySQLClient):
+            async with conn.acquire_connection():
+                pass
+
+
+def acquire_wait_histograms() -> dict[tuple, Histogram]:
+    return {
+        (conn.connection_name,): conn.acquire_wait for conn in connections.all() if isinstance(conn, MySQLClient)
+    }
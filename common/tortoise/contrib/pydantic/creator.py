@@ -1,11 +1,24 @@
 # ruff: noqa
 import inspect
+import pkgutil
+import importlib
 from types import UnionType, GenericAlias
 from base64 import b32encode
 from typing import TYPE_CHECKING, Any, Union, Optional, _UnionGenericAlias
+from collections.abc import Hashable, Iterable
 from hashlib import sha3_224
 
-from pydantic import Field, ConfigDict, create_model, computed_field
+from pydantic import (
+    Field,
+    ConfigDict,
+    AfterValidator,
+    WrapValidator,
+    PlainValidator,
+    BeforeValidator,
+    create_model,
+    computed_field,
+)
+from tortoise import manager
 from tortoise.fields import IntField, JSONField, TextField, relational
 from tortoise.models import Model
 from tortoise.queryset import QuerySet
@@ -16,6 +29,9 @@ from tortoise.contrib.pydantic.base import PydanticListModel as OriginPydanticLi
 from tortoise.contrib.pydantic.utils import get_annotations
 from tortoise.contrib.pydantic.creator import PydanticMeta as TortoisePydanticMeta
 
+from common.tortoise.prefetch import prefetch_plan
+from common.tortoise.fields.base import defer_timestamp_conversion
+
 
 class PydanticModel(OriginPydanticModel):
     @classmethod
@@ -36,7 +52,98 @@ class PydanticModel(OriginPydanticModel):
             cls.model_config["orig_model"],  # type: ignore
         )
         fetch_fields = [f for f in fetch_fields if f not in queryset._prefetch_queries]
-        return [cls.model_validate(e) for e in await queryset.prefetch_related(*fetch_fields)]
+        with defer_timestamp_conversion():
+            objs = await prefetch_plan(queryset.model, fetch_fields).fetch(queryset)
+        return [cls.model_validate(e) for e in objs]
+
+    @classmethod
+    async def from_queryset_trusted(
+        cls,
+        queryset: "QuerySet",
+    ) -> "list[OriginPydanticModel]":
+        """
+        只读列表的快速路径: values() 按 schema 字段取值(正向关联为 join), 组装后 model_construct,
+        跳过 Tortoise 实例化及 pydantic 校验, 序列化结果与 from_queryset 一致; 仅用于本库数据
+        schema 含反向/多对多关联、计算字段、转换值的校验器等无法直接取值的字段时回退到 from_queryset
+        """
+        layout = _trusted_layout(cls)
+        if layout is None:
+            return await cls.from_queryset(queryset)
+        rows = await queryset.values(*_layout_paths(layout))
+        return [_construct(cls, layout, row) for row in rows]
+
+
+# (字段名, values 路径) 或 (字段名, 子模型, 子 layout, 关联主键的 values 路径)
+_TRUSTED_LAYOUTS: dict[tuple[type, str], list | None] = {}
+_VALUE_TRANSFORMERS = (AfterValidator, BeforeValidator, PlainValidator, WrapValidator)
+
+
+def _trusted_layout(pydantic_class: type[PydanticModel], prefix: str = "") -> list | None:
+    key = (pydantic_class, prefix)
+    if key not in _TRUSTED_LAYOUTS:
+        _TRUSTED_LAYOUTS[key] = _build_trusted_layout(pydantic_class, prefix)
+    return _TRUSTED_LAYOUTS[key]
+
+
+def _build_trusted_layout(pydantic_class: type[PydanticModel], prefix: str) -> list | None:
+    decorators = pydantic_class.__pydantic_decorators__
+    if (
+        decorators.validators
+        # tortoise 自带的 _tortoise_convert 只处理关联对象及计算字段, values() 中不会出现
+        or decorators.field_validators.keys() - {"_tortoise_convert"}
+        or decorators.root_validators
+        or decorators.model_validators
+        or pydantic_class.model_computed_fields
+    ):
+        return None
+    model_class = pydantic_class.model_config["orig_model"]  # type: ignore
+    meta = model_class._meta
+    layout: list = []
+    for field_name, mf in pydantic_class.model_fields.items():
+        if any(isinstance(m, _VALUE_TRANSFORMERS) for m in mf.metadata):
+            return None
+        if field_name in meta.fk_fields or field_name in meta.o2o_fields:
+            annotation = mf.annotation
+            if annotation.__class__ in (_UnionGenericAlias, UnionType):
+                annotation = annotation.__args__[0]
+            related_model = meta.fields_map[field_name].related_model
+            # 自定义 manager 的过滤条件(如软删除)不作用于 join
+            if not (isinstance(annotation, type) and issubclass(annotation, PydanticModel)) or type(
+                related_model._meta.manager,
+            ) is not manager.Manager:
+                return None
+            sub_layout = _trusted_layout(annotation, f"{prefix}{field_name}__")
+            if sub_layout is None:
+                return None
+            pk_path = f"{prefix}{field_name}__{related_model._meta.pk_attr}"
+            layout.append((field_name, annotation, sub_layout, pk_path))
+        elif field_name in meta.fields_db_projection:
+            layout.append((field_name, f"{prefix}{field_name}"))
+        else:
+            return None
+    return layout
+
+
+def _layout_paths(layout: list) -> list[str]:
+    paths: dict[str, None] = {}
+    for entry in layout:
+        if len(entry) == 2:
+            paths[entry[1]] = None
+        else:
+            paths[entry[3]] = None
+            paths.update(dict.fromkeys(_layout_paths(entry[2])))
+    return list(paths)
+
+
+def _construct(pydantic_class: type[PydanticModel], layout: list, row: dict) -> PydanticModel:
+    data = {}
+    for entry in layout:
+        if len(entry) == 2:
+            data[entry[0]] = row[entry[1]]
+        else:
+            field_name, submodel, sub_layout, pk_path = entry
+            data[field_name] = None if row[pk_path] is None else _construct(submodel, sub_layout, row)
+    return pydantic_class.model_construct(**data)
 
 
 def _get_fetch_fields(
@@ -90,14 +197,47 @@ class PydanticListModel(OriginPydanticListModel):
             submodel.model_config["orig_model"],
         )
         fetch_fields = [f for f in fetch_fields if f not in queryset._prefetch_queries]
+        with defer_timestamp_conversion():
+            objs = await prefetch_plan(queryset.model, fetch_fields).fetch(queryset)
         return cls(
-            __root__=[  # type: ignore
-                submodel.model_validate(e) for e in await queryset.prefetch_related(*fetch_fields)
-            ],
+            __root__=[submodel.model_validate(e) for e in objs],  # type: ignore
         )
 
 
 _MODEL_INDEX: dict[str, type[PydanticModel]] = {}
+# 以全部参数为 key 缓存生成结果, 相同参数(含嵌套的子模型)再次调用时不再 describe 及遍历字段
+_CREATOR_INDEX: dict[Hashable, type[PydanticModel]] = {}
+
+
+def _sha3_digest(value: str) -> str:
+    return b32encode(sha3_224(value.encode("utf-8")).digest()).decode("utf-8").lower()
+
+
+def _cache_key(value: Any) -> Hashable:
+    """
+    参数转为可哈希的 key: dict 与顺序无关, list/tuple 转为 tuple, 模型类、函数等按对象本身比较
+    含不可哈希的值时抛出 TypeError
+    """
+    if isinstance(value, dict):
+        return dict, frozenset((k, _cache_key(v)) for k, v in value.items())
+    if isinstance(value, list | tuple):
+        return tuple(_cache_key(v) for v in value)
+    if isinstance(value, set | frozenset):
+        return frozenset(_cache_key(v) for v in value)
+    hash(value)
+    return value
+
+
+def precompute(packages: Iterable[str]) -> list[str]:
+    """
+    导入各包下的全部 schema 模块, 在导入时生成 pydantic 模型并记录到 _MODEL_INDEX, 返回已生成的模型名
+    preload 时在 master 中调用, fork 后各 worker 共享
+    """
+    for package in packages:
+        module = importlib.import_module(package)
+        for info in pkgutil.walk_packages(getattr(module, "__path__", []), f"{package}."):
+            importlib.import_module(info.name)
+    return sorted(_MODEL_INDEX)
 
 
 class PydanticMeta(TortoisePydanticMeta):
@@ -212,6 +352,31 @@ def pydantic_model_creator(
     fqname = cls.__module__ + "." + cls.__qualname__
     postfix = ""
 
+    try:
+        cache_key: Hashable | None = _cache_key(
+            (
+                cls,
+                name,
+                exclude,
+                include,
+                computed,
+                optional,
+                allow_cycles,
+                sort_alphabetically,
+                _stack,
+                exclude_readonly,
+                meta_override,
+                model_config,
+                validators,
+                module,
+            ),
+        )
+    except TypeError:
+        # 参数中有不可哈希的值时不缓存
+        cache_key = None
+    if cache_key is not None and cache_key in _CREATOR_INDEX:
+        return _CREATOR_INDEX[cache_key]
+
     def get_name() -> str:
         # If arguments are specified (different from the defaults), we append a hash to the
         # class name, to make it unique
@@ -226,11 +391,7 @@ def pydantic_model_creator(
             and allow_cycles is None
         )
         hashval = f"{fqname};{exclude};{include};{computed};{_stack}:{sort_alphabetically}:{allow_cycles}"
-        postfix = (
-            ":" + b32encode(sha3_224(hashval.encode("utf-8")).digest()).decode("utf-8").lower()[:6]
-            if not is_default
-            else ""
-        )
+        postfix = ":" + _sha3_digest(hashval)[:6] if not is_default else ""
         return fqname + postfix
 
     # We need separate model class for different exclude, include and computed parameters
@@ -468,6 +629,8 @@ def pydantic_model_creator(
     # Here we de-dup to ensure that a uniquely named object is a unique object
     # This fixes some Pydantic constraints.
     if _name in _MODEL_INDEX:
+        if cache_key is not None:
+            _CREATOR_INDEX[cache_key] = _MODEL_INDEX[_name]
         return _MODEL_INDEX[_name]
 
     # Creating Pydantic class for the properties generated before
@@ -485,6 +648,8 @@ def pydantic_model_creator(
     model.model_config["orig_model"] = cls  # type: ignore
     # Store model reference so we can de-dup it later on if needed.
     _MODEL_INDEX[_name] = model
+    if cache_key is not None:
+        _CREATOR_INDEX[cache_key] = model
     return model
 
 
@@ -1,4 +1,5 @@
 from typing import Literal
+from collections.abc import Callable
 
 from pydantic import Field, BaseModel
 
@@ -12,3 +13,9 @@ class GeoDataType(BaseModel):
     ] = Field(
         description="点位信息",
     )  # ruff: noqa: E501
+
+    def transform(self, coordinate_transform: Callable) -> "GeoDataType":
+        """坐标系批量转换, 如 common.coordinate.wgs84_to_gcj02_batch"""
+        from common.coordinate import transform_nested
+
+        return self.model_copy(update={"coordinates": transform_nested(self.coordinates, coordinate_transform)})
@@ -1,18 +1,29 @@
 import abc
+import time
 import uuid
 import datetime
 import warnings
-from typing import Any, TypeVar
+from typing import Any, Literal, TypeVar
 from urllib.parse import urlparse
-from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
 
-import orjson
 from tortoise import fields, timezone, validators
 from tortoise.models import Model
 from tortoise.timezone import get_use_tz, get_default_timezone
 from tortoise.exceptions import ConfigurationError
 from tortoise.expressions import RawSQL
-
+from pydantic_core import core_schema
+from cachetools import TLRUCache
+from pydantic import GetCoreSchemaHandler, GetJsonSchemaHandler
+from starlette_context import context
+from starlette.concurrency import run_in_threadpool
+
+from common.enums import ContextKeyEnum
+from common.utils import bin_to_uuid, uuid_to_bin, swap_uuid_bytes
+from common.geometry import DEFAULT_SRID, Geometry
 from common.tortoise.contrib.pydantic.types import GeoDataType
 
 
@@ -25,6 +36,14 @@ class StorageMixin:
     ) -> tuple[bool, str]:
         ...
 
+    def get_full_paths(
+        self,
+        paths: Iterable[str],
+        expire: int | None = None,
+    ) -> dict[str, tuple[bool, str]]:
+        """批量获取访问地址, 存储实现支持批量签名时应覆盖"""
+        return {path: self.get_full_path(path, expire) for path in paths}
+
     def get_stored_path(
         self,
         url: str,
@@ -40,12 +59,114 @@ class StorageMixin:
 
 StorageType = TypeVar("StorageType", bound=StorageMixin)
 
+SIGNED_URL_DEFAULT_TTL = 3600  # 秒, expire 为空时的缓存时长
+
+
+def _signed_url_ttu(key: tuple, value: tuple[str, float], now: float) -> float:
+    return value[1]
+
+
+# (存储, 路径, 有效期) -> (访问地址, 缓存到期时间)
+_signed_url_cache: TLRUCache = TLRUCache(maxsize=10000, ttu=_signed_url_ttu, timer=time.monotonic)
+
+
+class FileURL(str):
+    """
+    FileField 的取值: 字符串内容为存储路径, 访问地址在序列化时按请求批量签名
+    """
+
+    storage: StorageMixin
+    expire: int | None
+    _url: str | None
+
+    def __new__(cls, path: str, storage: StorageMixin, expire: int | None = None) -> "FileURL":
+        obj = super().__new__(cls, path)
+        obj.storage = storage
+        obj.expire = expire
+        obj._url = None
+        return obj
+
+    @property
+    def path(self) -> str:
+        return str.__str__(self)
+
+    @property
+    def url(self) -> str:
+        if self._url is None:
+            resolve_file_urls([self])
+        return self._url  # type: ignore
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            lambda v: v if isinstance(v, str) else str(v),
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda v: v.url if isinstance(v, FileURL) else v,
+                when_used="always",
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> dict:
+        return {"type": "string", "format": "uri"}
+
+
+def resolve_file_urls(file_urls: Iterable[FileURL]) -> None:
+    """按 (存储, 有效期) 分组, 未命中缓存的路径一次性交给 get_full_paths"""
+    missing: dict[tuple[StorageMixin, int | None], list[FileURL]] = defaultdict(list)
+    for file_url in file_urls:
+        if file_url._url is not None:
+            continue
+        cached = _signed_url_cache.get((id(file_url.storage), file_url.path, file_url.expire))
+        if cached:
+            file_url._url = cached[0]
+        else:
+            missing[(file_url.storage, file_url.expire)].append(file_url)
+
+    for (storage, expire), group in missing.items():
+        try:
+            results = storage.get_full_paths({i.path for i in group}, expire)
+        except Exception as e:
+            raise ValueError(
+                f"Obtain file from storage {storage} failed with exception {e}",
+            ) from e
+        ttl = expire - min(60, expire // 10) if expire else SIGNED_URL_DEFAULT_TTL
+        expire_at = time.monotonic() + ttl
+        for file_url in group:
+            is_success, url_or_error = results[file_url.path]
+            if not is_success:
+                raise ValueError(url_or_error)
+            file_url._url = url_or_error
+            _signed_url_cache[(id(storage), file_url.path, expire)] = (url_or_error, expire_at)
+
+
+def _has_unresolved(file_urls: list[FileURL]) -> bool:
+    return any(
+        i._url is None and (id(i.storage), i.path, i.expire) not in _signed_url_cache for i in file_urls
+    )
+
+
+async def resolve_pending_file_urls() -> None:
+    """解析当前请求中延迟的 FileURL, 需要签名时在线程池中执行"""
+    if not context.exists():
+        return
+    pending: list[FileURL] | None = context.get(ContextKeyEnum.pending_file_urls.value)
+    if not pending:
+        return
+    context[ContextKeyEnum.pending_file_urls.value] = []
+    if _has_unresolved(pending):
+        await run_in_threadpool(resolve_file_urls, pending)
+    else:
+        resolve_file_urls(pending)
+
 
 class FileField(fields.CharField):
     """
-    OSS文件字段
+    OSS文件字段, 取值为 FileURL, 访问地址在响应序列化时批量签名
     """
 
+    field_type = FileURL
+
     _file_storage: StorageMixin
     _expire: int | None
     _extensions: list[str] | None
@@ -66,7 +187,9 @@ class FileField(fields.CharField):
     def to_db_value(self, value: str, instance: "FileField") -> str:  # type: ignore
         if not value:
             return ""
-        if value.startswith("http"):
+        if isinstance(value, FileURL):
+            value = value.path
+        elif value.startswith("http"):
             value = self._file_storage.get_stored_path(value)
         extension = value.split(".")[-1]
         if self._extensions and extension not in self._extensions:
@@ -76,21 +199,15 @@ class FileField(fields.CharField):
         return value
 
     def to_python_value(self, value: str) -> str | None:
-        if not value or value.startswith("http"):
+        if not value or value.startswith("http") or isinstance(value, FileURL):
             return value
-        try:
-            is_success, url_or_error = self._file_storage.get_full_path(
-                value,
-                self._expire,
-            )
-        except Exception as e:
-            raise ValueError(
-                f"Obtain file from storage {self._file_storage} failed with exception {e}",
-            ) from e
-        else:
-            if is_success:
-                return url_or_error  # type: ignore
-            raise ValueError(url_or_error)
+        file_url = FileURL(value, self._file_storage, self._expire)
+        if context.exists():
+            pending = context.get(ContextKeyEnum.pending_file_urls.value)
+            if pending is None:
+                pending = context[ContextKeyEnum.pending_file_urls.value] = []
+            pending.append(file_url)
+        return file_url
 
 
 class TimestampField(fields.DatetimeField):
@@ -131,14 +248,24 @@ class TimestampField(fields.DatetimeField):
             validators=validators,
         )
         self.read_only = read_only
+        self._timezone: datetime.tzinfo | None = None
+
+    @property
+    def timezone(self) -> datetime.tzinfo:
+        # 首次使用时解析, 避免模块导入时依赖配置
+        if self._timezone is None:
+            from conf.config import local_configs
+
+            self._timezone = local_configs.relational.timezone
+        return self._timezone
 
-    def to_db_value(self, value: int | datetime.datetime, instance: "TimestampField") -> str:  # type: ignore
+    def to_db_value(self, value: int | datetime.datetime, instance: "TimestampField") -> int:  # type: ignore
         if value is None:
-            return "0"
+            return 0
         if isinstance(value, datetime.datetime):
             value = int(value.timestamp())
         self.validate(value)
-        return str(value)
+        return value
 
     @property
     def constraints(self) -> dict:
@@ -146,19 +273,84 @@ class TimestampField(fields.DatetimeField):
 
     def to_python_value(
         self,
-        value: str | int | None,
+        value: str | int | datetime.datetime | None,
     ) -> datetime.datetime | None:
         if value is None or value in [0, "0"]:
             return None
         # if value == "0":
         #     # 区分 0 和 null
         #     return 0  # type: ignore
-        from conf.config import local_configs
+        if isinstance(value, datetime.datetime):
+            return value
+        return datetime.datetime.fromtimestamp(int(value), self.timezone)
 
-        return datetime.datetime.fromtimestamp(
-            value,  # type: ignore
-            local_configs.relational.timezone,
-        )
+    def to_python_values(self, values: list) -> list[datetime.datetime | None]:
+        """整列转换, 相同的时间戳只转换一次"""
+        tz = self.timezone
+        fromtimestamp = datetime.datetime.fromtimestamp
+        converted = {value: fromtimestamp(int(value), tz) if value else None for value in set(values)}
+        converted["0"] = None  # 与 to_python_value 一致, "0" 视为空
+        return [converted[value] for value in values]
+
+
+_timestamp_columns: dict[type[Model], list[tuple[str, str, TimestampField]]] = {}
+_deferred_timestamps: ContextVar[dict[TimestampField, tuple[list, list]] | None] = ContextVar(
+    "deferred_timestamps",
+    default=None,
+)
+
+
+def timestamp_columns(model: type[Model]) -> list[tuple[str, str, TimestampField]]:
+    """模型的 TimestampField 列: (数据库列名, 字段名, 字段)"""
+    columns = _timestamp_columns.get(model)
+    if columns is None:
+        columns = _timestamp_columns[model] = [
+            (key, model_field, field)
+            for key, model_field, field in model._meta.db_complex_fields
+            if isinstance(field, TimestampField)
+        ]
+    return columns
+
+
+def defer_timestamps(model: type[Model], row: dict) -> list[tuple[str, TimestampField, Any]] | None:
+    """
+    defer_timestamp_conversion 期间, 取出行中的 TimestampField 原始值并置空, 返回 (字段名, 字段, 原始值)
+    实例创建后需调用 register_deferred_timestamps
+    """
+    if _deferred_timestamps.get() is None:
+        return None
+    deferred = []
+    for key, model_field, field in timestamp_columns(model):
+        if key in row:
+            deferred.append((model_field, field, row[key]))
+            row[key] = None
+    return deferred
+
+
+def register_deferred_timestamps(instance: Model, deferred: list[tuple[str, TimestampField, Any]]) -> None:
+    pending = _deferred_timestamps.get()
+    if pending is None:
+        return
+    for model_field, field, value in deferred:
+        group = pending.get(field)
+        if group is None:
+            group = pending[field] = ([], [])
+        group[0].append((instance, model_field))
+        group[1].append(value)
+
+
+@contextmanager
+def defer_timestamp_conversion() -> Iterator[None]:
+    """期间加载的实例暂不转换 TimestampField, 退出时按列批量转换"""
+    pending: dict[TimestampField, tuple[list, list]] = {}
+    token = _deferred_timestamps.set(pending)
+    try:
+        yield
+    finally:
+        _deferred_timestamps.reset(token)
+        for field, (targets, values) in pending.items():
+            for (instance, model_field), value in zip(targets, field.to_python_values(values), strict=True):
+                setattr(instance, model_field, value)
 
 
 class TimeField(fields.TimeField):
@@ -212,34 +404,48 @@ class TimeField(fields.TimeField):
 
 
 class BinaryUUIDField(fields.Field[uuid.UUID], uuid.UUID):
+    """
+    BINARY(16) 存储的 UUID, 以16字节原始值作为参数绑定
+    swap=True 时与 MySQL UUID_TO_BIN(uuid, 1) 的存储格式一致
+    """
+
     SQL_TYPE = "BINARY(16)"
 
     class _db_postgres:
         SQL_TYPE = "UUID"
 
-    def to_db_value(self, value: uuid.UUID | str | bytes | None, instance: type[Model] | Model) -> RawSQL | None:
+    def __init__(self, swap: bool = False, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.swap_flag: Literal[0, 1] = 1 if swap else 0
+
+    def to_db_value(
+        self,
+        value: uuid.UUID | str | bytes | None,
+        instance: type[Model] | Model,
+    ) -> bytes | RawSQL | None:
         match value:
             case RawSQL():
                 return value
             case uuid.UUID():
-                return RawSQL(f"UUID_TO_BIN('{value}')")
+                return uuid_to_bin(value, self.swap_flag)
             case str():
-                return RawSQL(f"UUID_TO_BIN('{uuid.UUID(value)}')")
-            case bytes():
-                return RawSQL(f"UUID_TO_BIN('{uuid.UUID(bytes=value)}')")
+                return uuid_to_bin(uuid.UUID(value), self.swap_flag)
+            case bytes() if len(value) == 16:
+                # 与 uuid.UUID.bytes 相同的字节序
+                return swap_uuid_bytes(value) if self.swap_flag else value
             case None:
                 return None
             case _:
                 raise ConfigurationError("This field only accepts UUID values")
 
-    def to_python_value(self, value: str | None) -> uuid.UUID | None:
+    def to_python_value(self, value: uuid.UUID | str | bytes | None) -> uuid.UUID | None:
         match value:
             case uuid.UUID():
                 return value
+            case bytes():
+                return bin_to_uuid(value, self.swap_flag)
             case str():
                 return uuid.UUID(value)
-            case bytes():
-                return uuid.UUID(bytes=value)
             case None:
                 return None
             case _:
@@ -247,24 +453,53 @@ class BinaryUUIDField(fields.Field[uuid.UUID], uuid.UUID):
 
 
 # ! Mysql 8.0; 未处理PostGIS
-class GeometryField(fields.Field):
+class GeometryField(fields.Field[Geometry]):
+    """
+    以 MySQL 内部格式(SRID + WKB)的 bytes 读写, 查询结果为惰性解析的 Geometry, 响应时序列化为 GeoJSON
+    srid: 写入时 GeoJSON 使用的 SRID, 需与列定义一致
+    coordinate_transform: 入库前的坐标系批量转换, 如 common.coordinate.wgs84_to_gcj02_batch;
+    仅作用于外部输入的 GeoJSON(dict/str)与 GeoDataType, Geometry 与 bytes 视为已是库内坐标系, 原样写入
+    """
+
     SQL_TYPE = "GEOMETRY"
+    field_type = Geometry
+
+    def __init__(self, srid: int = DEFAULT_SRID, coordinate_transform: Callable | None = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.srid = srid
+        self.coordinate_transform = coordinate_transform
+
+    def _from_input(self, value: str | dict | GeoDataType) -> Geometry:
+        """外部输入转换为库内坐标系的 Geometry"""
+        try:
+            geometry = Geometry.validate(value, self.srid)
+        except (ValueError, KeyError) as e:
+            raise ConfigurationError(f"This field only accepts geometry values: {e}") from e
+        if self.coordinate_transform:
+            geometry = geometry.transform(self.coordinate_transform)
+        return geometry
 
-    def to_db_value(self, value: str | dict | GeoDataType | None, instance: type[Model] | Model) -> RawSQL | None:
+    def to_db_value(
+        self,
+        value: Geometry | str | dict | GeoDataType | bytes | None,
+        instance: type[Model] | Model,
+    ) -> bytes | RawSQL | None:
         match value:
             case RawSQL():
                 return value
-            case str():
-                # return RawSQL(f"ST_GeomFromText('{value}')")
-                return RawSQL(f"ST_GeomFromGeoJSON('{value}')")
-            case dict():
-                return RawSQL(f"ST_GeomFromGeoJSON('{orjson.dumps(value).decode()}')")
-            case GeoDataType():
-                return RawSQL(f"ST_GeomFromGeoJSON('{orjson.dumps(value.model_dump(by_alias=True)).decode()}')")
             case None:
                 return None
-            case _:
-                raise ConfigurationError("This field only accepts str or None")
-
-    def to_python_value(self, value: Any | None) -> str | None:
-        return value
+            case Geometry():
+                return value.to_mysql()
+            case bytes() | bytearray() | memoryview():
+                return bytes(value)
+        return self._from_input(value).to_mysql()
+
+    def to_python_value(self, value: Geometry | str | dict | GeoDataType | bytes | None) -> Geometry | None:
+        # 模型实例化时的外部输入同样在此转换, 之后的 Geometry 不再重复转换
+        match value:
+            case None | Geometry():
+                return value
+            case bytes() | bytearray() | memoryview():
+                return Geometry.from_mysql(bytes(value))
+        return self._from_input(value)
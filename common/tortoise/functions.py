@@ -1,17 +1,17 @@
 from pypika import CustomFunction
-from tortoise.expressions import Function
+from tortoise.expressions import RawSQL, Function
+
+from common.geometry import DEFAULT_SRID, Geometry
 
 
 class STAsWKBFunc(Function):
     """
-    from shapely import wkb
-    from shapely.geometry import mapping
-
+    GeometryField 直接读取内部格式即可得到 Geometry, 一般无需本函数
 
-    geo_data_binary = f.geo_data_wkb
-    geom = wkb.loads(geo_data_binary)
-    geojson = mapping(geom)
+    from common.geometry import Geometry
 
+    geometry = Geometry(f.geo_data_wkb, srid=4326)
+    geojson = geometry.to_geojson()  # SRID 4326 时 ST_AsWKB 按 纬度-经度 顺序输出
     """
 
     database_func = CustomFunction(
@@ -34,3 +34,59 @@ class Md5Func(Function):
             "field",
         ],
     )
+
+
+class STContainsFunc(Function):
+    """
+    ST_Contains(g1, g2): g1 是否包含 g2
+    override: annotate(hit=STContainsFunc("geo_data", point_sql(lng, lat)))
+    过滤请使用 common.tortoise.spatial.ContainsQ, 以便命中 SPATIAL INDEX
+    """
+
+    database_func = CustomFunction(
+        "ST_Contains",
+        [
+            "field",
+            "value",
+        ],
+    )
+
+
+class MBRContainsFunc(Function):
+    """
+    MBRContains(g1, g2): g1 的外包矩形是否包含 g2 的外包矩形
+    """
+
+    database_func = CustomFunction(
+        "MBRContains",
+        [
+            "field",
+            "value",
+        ],
+    )
+
+
+class STDistanceSphereFunc(Function):
+    """
+    ST_Distance_Sphere(g1, g2): 球面距离/米, 仅支持 Point/MultiPoint
+    override: annotate(distance=STDistanceSphereFunc("location", point_sql(lng, lat))).order_by("distance")
+    """
+
+    database_func = CustomFunction(
+        "ST_Distance_Sphere",
+        [
+            "field",
+            "value",
+        ],
+    )
+
+
+def point_sql(lng: float, lat: float, srid: int = DEFAULT_SRID) -> RawSQL:
+    """点位常量, POINT(x, y) 以 经度-纬度 构造, 与 GeometryField 的内部格式一致"""
+    return RawSQL(f"ST_SRID(POINT({float(lng)!r}, {float(lat)!r}), {int(srid)})")
+
+
+def geometry_sql(geometry: Geometry) -> RawSQL:
+    """几何常量, WKB 以十六进制字面量内联, 按 经度-纬度 解析"""
+    options = ", 'axis-order=long-lat'" if geometry.srid else ""
+    return RawSQL(f"ST_GeomFromWKB(X'{geometry.wkb.hex()}', {int(geometry.srid)}{options})")
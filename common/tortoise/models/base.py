@@ -1,5 +1,5 @@
 import uuid
-from typing import TypeVar
+from typing import Any, TypeVar
 
 from tortoise import fields, manager
 from tortoise.models import Model
@@ -7,7 +7,12 @@ from tortoise.queryset import QuerySet
 from tortoise.backends.base.client import BaseDBAsyncClient
 
 from common.utils import datetime_now, sequential_uuid_from_ulid
-from common.tortoise.fields.base import TimestampField, BinaryUUIDField
+from common.tortoise.fields.base import (
+    TimestampField,
+    BinaryUUIDField,
+    defer_timestamps,
+    register_deferred_timestamps,
+)
 
 
 class NotDeletedManager(manager.Manager):
@@ -50,6 +55,14 @@ class TimeStampModel(Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def _init_from_db(cls, **kwargs: Any) -> "TimeStampModel":  # ruff: noqa: ANN401
+        deferred = defer_timestamps(cls, kwargs)
+        instance = super()._init_from_db(**kwargs)
+        if deferred:
+            register_deferred_timestamps(instance, deferred)
+        return instance
+
     async def save(
         self,
         using_db: BaseDBAsyncClient | None = None,
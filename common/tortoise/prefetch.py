@@ -0,0 +1,198 @@
+"""
+关联字段预取计划
+
+将 a__b__c 形式的预取路径合并为树, 为每个关联选择加载方式:
+    select_related  与根模型同库、且父节点也是 select_related 的正向一对一/外键关联, 随主查询 join 一次取回
+    prefetch        其余关联, 按关联模型所在的库分组, 不同库的分组并发执行
+    forwarded       与父节点同库的 prefetch, 并入父节点的 prefetch_related 路径中一同执行
+
+    plan = PrefetchPlan.build(Account, ["company", "roles", "company__owner"])
+    print(plan.explain())
+    accounts = await plan.fetch(Account.filter(...))
+"""
+import asyncio
+from enum import Enum
+from dataclasses import field, dataclass
+from collections.abc import Iterable
+
+from loguru import logger
+from tortoise import manager
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+
+class PrefetchStrategy(str, Enum):
+    select_related = "select_related"
+    prefetch = "prefetch"
+    forwarded = "forwarded"
+
+
+@dataclass
+class PrefetchNode:
+    model: type[Model]  # 关联字段所在的模型
+    field_name: str
+    path: str
+    related_model: type[Model]
+    strategy: PrefetchStrategy = PrefetchStrategy.prefetch
+    reason: str = ""
+    children: list["PrefetchNode"] = field(default_factory=list)
+
+    @property
+    def connection(self) -> str:
+        return self.related_model._meta.default_connection  # type: ignore
+
+    @property
+    def to_one(self) -> bool:
+        meta = self.model._meta
+        return self.field_name in meta.fk_fields or self.field_name in meta.o2o_fields
+
+    def forwarded_paths(self) -> list[str]:
+        """本节点及并入其中的同库子孙节点的 prefetch 路径"""
+        paths = [self.field_name]
+        for child in self.children:
+            if child.strategy == PrefetchStrategy.forwarded:
+                paths.extend(f"{self.field_name}__{p}" for p in child.forwarded_paths())
+        return paths
+
+
+def _related_instances(instances: Iterable[Model], field: str) -> list[Model]:
+    """已加载的关联对象, 按对象去重"""
+    result: dict[int, Model] = {}
+    for instance in instances:
+        value = getattr(instance, field, None)
+        if value is None:
+            continue
+        for obj in [value] if isinstance(value, Model) else value.related_objects:
+            result[id(obj)] = obj
+    return list(result.values())
+
+
+class PrefetchPlan:
+    def __init__(self, model: type[Model], nodes: list[PrefetchNode]) -> None:
+        self.model = model
+        self.nodes = nodes
+
+    @classmethod
+    def build(cls, model: type[Model], paths: Iterable[str], join: bool = True) -> "PrefetchPlan":
+        """join 为 False 时不使用 select_related, 用于已加载的对象"""
+        tree: dict = {}
+        for path in paths:
+            node = tree
+            for name in path.split("__"):
+                node = node.setdefault(name, {})
+        root_connection = model._meta.default_connection
+        return cls(model, cls._build_nodes(model, tree, "", None, join, root_connection))
+
+    @classmethod
+    def _build_nodes(
+        cls,
+        model: type[Model],
+        tree: dict,
+        prefix: str,
+        parent: PrefetchNode | None,
+        join: bool,
+        root_connection: str | None,
+    ) -> list[PrefetchNode]:
+        nodes = []
+        for name, subtree in tree.items():
+            if name not in model._meta.fetch_fields:
+                raise ValueError(f"Relation {name} for {model.__name__} not found")
+            related_model = model._meta.fields_map[name].related_model  # type: ignore
+            node = PrefetchNode(model, name, f"{prefix}{name}", related_model)
+            node.strategy, node.reason = cls._choose(node, parent, join, root_connection)
+            node.children = cls._build_nodes(related_model, subtree, f"{node.path}__", node, join, root_connection)
+            nodes.append(node)
+        return nodes
+
+    @staticmethod
+    def _choose(
+        node: PrefetchNode,
+        parent: PrefetchNode | None,
+        join: bool,
+        root_connection: str | None,
+    ) -> tuple[PrefetchStrategy, str]:
+        if parent is not None and parent.strategy != PrefetchStrategy.select_related:
+            if node.connection == parent.connection:
+                return PrefetchStrategy.forwarded, f"same database as {parent.path}"
+            return PrefetchStrategy.prefetch, f"database {node.connection}"
+        if not join:
+            return PrefetchStrategy.prefetch, "join disabled"
+        if not node.to_one:
+            return PrefetchStrategy.prefetch, "to-many relation"
+        if node.connection != root_connection:
+            return PrefetchStrategy.prefetch, f"cross database {node.connection}"
+        if type(node.related_model._meta.manager) is not manager.Manager:
+            # 自定义 manager 的过滤条件(如软删除)不作用于 join
+            return PrefetchStrategy.prefetch, "custom manager"
+        return PrefetchStrategy.select_related, "to-one relation in the same database"
+
+    def iter_nodes(self) -> Iterable[PrefetchNode]:
+        pending = list(reversed(self.nodes))
+        while pending:
+            node = pending.pop()
+            yield node
+            pending.extend(reversed(node.children))
+
+    @property
+    def select_related(self) -> list[str]:
+        return [node.path for node in self.iter_nodes() if node.strategy == PrefetchStrategy.select_related]
+
+    def explain(self) -> str:
+        lines = [f"Prefetch plan for {self.model.__name__}:"]
+        for node in self.iter_nodes():
+            lines.append(
+                f"  {node.path}: {node.strategy.value} "
+                f"({node.model.__name__} -> {node.related_model.__name__}, {node.reason})",
+            )
+        return "\n".join(lines)
+
+    async def fetch(self, queryset: QuerySet) -> list[Model]:
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        instances = await queryset
+        await self.prefetch(instances)
+        return instances
+
+    async def prefetch(self, instances: list[Model]) -> None:
+        await self._execute(self.model, instances, self.nodes)
+
+    @classmethod
+    async def _execute(cls, model: type[Model], instances: list[Model], nodes: list[PrefetchNode]) -> None:
+        """nodes 为 model 上的关联, instances 为已加载的 model 对象"""
+        if not instances or not nodes:
+            return
+        groups: dict[str, tuple[BaseDBAsyncClient, list[str]]] = {}
+        for node in nodes:
+            if node.strategy == PrefetchStrategy.prefetch:
+                if node.connection not in groups:
+                    groups[node.connection] = (node.related_model._choose_db(), [])
+                groups[node.connection][1].extend(node.forwarded_paths())
+        await asyncio.gather(
+            *(model.fetch_for_list(instances, *paths, using_db=db) for db, paths in groups.values()),
+        )
+        # 已加载的下一层中仍需单独 prefetch 的关联: 跨库, 或 select_related 节点下的一对多
+        await asyncio.gather(
+            *(
+                cls._execute(node.related_model, _related_instances(instances, node.field_name), node.children)
+                for node in nodes
+                if _needs_prefetch(node.children)
+            ),
+        )
+
+
+def _needs_prefetch(nodes: list[PrefetchNode]) -> bool:
+    return any(node.strategy == PrefetchStrategy.prefetch or _needs_prefetch(node.children) for node in nodes)
+
+
+_PLANS: dict[tuple[type[Model], tuple[str, ...], bool], PrefetchPlan] = {}
+
+
+def prefetch_plan(model: type[Model], paths: Iterable[str], join: bool = True) -> PrefetchPlan:
+    """按 (模型, 路径, join) 缓存的预取计划, 首次生成时输出 explain 到 debug 日志"""
+    key = (model, tuple(sorted(set(paths))), join)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _PLANS[key] = PrefetchPlan.build(model, key[1], join)
+        logger.debug(plan.explain())
+    return plan
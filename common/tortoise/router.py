@@ -0,0 +1,82 @@
+"""读写分离路由: replica_reads() 范围内的读取随机分发至只读副本, 其余读取、写请求及事务内的查询走主库
+
+副本连接以 ``{主库连接名}_replica_{序号}`` 命名注册在 tortoise connections 中,
+与引擎无关, 本地可用两个 sqlite 连接模拟主库与副本::
+
+    await Tortoise.init(
+        config={
+            "connections": {
+                "user_center": "sqlite://primary.sqlite3",
+                "user_center_replica_0": "sqlite://replica.sqlite3",
+            },
+            "apps": {...},
+            "routers": ["common.tortoise.router.ReadReplicaRouter"],
+        },
+    )
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections.abc import Iterator
+
+from tortoise import connections
+from tortoise.models import Model
+from starlette_context import context
+from tortoise.backends.base.client import BaseTransactionWrapper
+
+from conf.defines import REPLICA_CONNECTION_INFIX
+from common.enums import ContextKeyEnum
+
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """期间的读取可分发至只读副本, 仅用于可容忍复制延迟的列表、计数等查询"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def mark_primary_sticky() -> None:
+    """当前请求发生写入后, 后续读取走主库, 保证读己之写"""
+    if context.exists():
+        context[ContextKeyEnum.db_primary_sticky.value] = True
+
+
+def is_primary_sticky() -> bool:
+    return context.exists() and bool(context.get(ContextKeyEnum.db_primary_sticky.value))
+
+
+def _in_transaction(connection_name: str) -> bool:
+    # 事务中 connections.get 返回的是 TransactionWrapper
+    return isinstance(connections.get(connection_name), BaseTransactionWrapper)
+
+
+class ReadReplicaRouter:
+    def __init__(self) -> None:
+        self._replicas: dict[str, list[str]] = {}
+
+    def replicas(self, connection_name: str) -> list[str]:
+        replicas = self._replicas.get(connection_name)
+        if replicas is None:
+            prefix = f"{connection_name}{REPLICA_CONNECTION_INFIX}"
+            replicas = self._replicas[connection_name] = sorted(
+                name for name in connections.db_config if name.startswith(prefix)
+            )
+        return replicas
+
+    def db_for_read(self, model: type[Model]) -> str | None:
+        connection_name = model._meta.default_connection
+        if not connection_name or not _replica_reads.get():
+            return None
+        replicas = self.replicas(connection_name)
+        if not replicas or is_primary_sticky() or _in_transaction(connection_name):
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model: type[Model]) -> None:
+        # 返回 None 时使用模型默认连接, 即主库; 发生写入后当前请求的读取均走主库
+        mark_primary_sticky()
@@ -0,0 +1,113 @@
+import re
+from collections import deque
+from collections.abc import Iterable
+
+from loguru import logger
+from cachetools import LRUCache
+from starlette_context import context
+
+from common.enums import ContextKeyEnum, InfoLoggerNameEnum
+
+_STRING_REGEX = re.compile(r"(?:_binary|[xXbB])?'(?:[^'\\]|\\.|'')*'")
+_NUMBER_REGEX = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_IN_LIST_REGEX = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_REGEX = re.compile(r"\bVALUES\s*(\([?,\s]*\))(?:\s*,\s*\([?,\s]*\))*", re.IGNORECASE)
+_WHITESPACE_REGEX = re.compile(r"\s+")
+
+_fingerprint_cache: LRUCache = LRUCache(maxsize=2048)
+
+
+def fingerprint(sql: str) -> str:
+    """SQL 指纹: 字面量替换为 ?, IN 列表及批量 VALUES 折叠, 空白归一"""
+    result = _fingerprint_cache.get(sql)
+    if result is not None:
+        return result
+    normalized = _STRING_REGEX.sub("?", sql)
+    normalized = _NUMBER_REGEX.sub("?", normalized)
+    normalized = normalized.replace("%s", "?")
+    normalized = _IN_LIST_REGEX.sub("IN (?+)", normalized)
+    normalized = _VALUES_REGEX.sub(r"VALUES \1", normalized)
+    normalized = _WHITESPACE_REGEX.sub(" ", normalized).strip()
+    _fingerprint_cache[sql] = normalized
+    return normalized
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class QueryStats:
+    """单个 SQL 指纹的耗时统计, 分位数基于最近 max_samples 次"""
+
+    __slots__ = ("connection_name", "count", "total", "max", "samples")
+
+    def __init__(self, connection_name: str, max_samples: int) -> None:
+        self.connection_name = connection_name
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=max_samples)
+
+    def add(self, duration: float) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.samples.append(duration)
+
+    def summary(self) -> dict:
+        samples = sorted(self.samples)
+        return {
+            "connection_name": self.connection_name,
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": percentile(samples, 0.5),
+            "p95": percentile(samples, 0.95),
+            "p99": percentile(samples, 0.99),
+        }
+
+
+class SlowQueryRecorder:
+    """慢查询记录: 输出结构化日志并按 SQL 指纹聚合耗时"""
+
+    def __init__(self, max_fingerprints: int = 500, max_samples: int = 1000) -> None:
+        self.max_samples = max_samples
+        self._stats: LRUCache = LRUCache(maxsize=max_fingerprints)
+
+    def record(
+        self,
+        connection_name: str,
+        sql: str,
+        duration: float,
+        rowcount: int | None = None,
+    ) -> None:
+        fp = fingerprint(sql)
+        stats = self._stats.get(fp)
+        if stats is None:
+            stats = self._stats[fp] = QueryStats(connection_name, self.max_samples)
+        stats.add(duration)
+
+        logger.bind(name=InfoLoggerNameEnum.info_slow_query_logger.value).warning(
+            {
+                "connection_name": connection_name,
+                "fingerprint": fp,
+                "duration": duration * 1000,  # ms
+                "rowcount": rowcount,
+                "request_id": context.get(ContextKeyEnum.request_id.value) if context.exists() else None,
+            },
+        )
+
+    def stats(self, fingerprints: Iterable[str] | None = None) -> list[dict]:
+        """按累计耗时倒序的指纹统计"""
+        keys = list(fingerprints) if fingerprints is not None else list(self._stats.keys())
+        result = [{"fingerprint": k, **self._stats[k].summary()} for k in keys if k in self._stats]
+        return sorted(result, key=lambda i: i["avg"] * i["count"], reverse=True)
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+slow_query_recorder = SlowQueryRecorder()
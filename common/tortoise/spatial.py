@@ -0,0 +1,150 @@
+"""
+空间查询条件及 SPATIAL INDEX 迁移 SQL
+
+MySQL 仅在列定义了 SRID 且为 NOT NULL 时才会对其使用 SPATIAL INDEX, 新增列参考::
+
+    # storages/relational/migrate/{app}/x_xxx_add_fence.py
+    async def upgrade(db: BaseDBAsyncClient) -> str:
+        return add_spatial_column_sql("fence", "geo_data", comment="围栏")
+
+    async def downgrade(db: BaseDBAsyncClient) -> str:
+        return drop_spatial_column_sql("fence", "geo_data")
+
+查询::
+
+    await Fence.filter(ContainsQ("geo_data", point_sql(lng, lat)), enabled=True)
+    await Vehicle.filter(WithinDistanceQ("location", lng, lat, 500))
+"""
+import abc
+import copy
+import math
+from typing import Any
+
+from pypika import Table, CustomFunction
+from pypika.terms import Criterion
+from tortoise.models import Model
+from tortoise.expressions import Q, RawSQL
+from tortoise.query_utils import QueryModifier
+
+from common.geometry import DEFAULT_SRID, Geometry
+from common.tortoise.functions import point_sql, geometry_sql
+
+_st_contains = CustomFunction("ST_Contains", ["g1", "g2"])
+_mbr_contains = CustomFunction("MBRContains", ["g1", "g2"])
+_st_distance_sphere = CustomFunction("ST_Distance_Sphere", ["g1", "g2"])
+
+METERS_PER_DEGREE = 111320.0
+
+
+class SpatialQ(Q, abc.ABC):
+    """自定义 where 条件的 Q, 可与普通 Q 组合及取反"""
+
+    def __init__(self, field_name: str) -> None:
+        super().__init__()
+        self.field_name = field_name
+
+    @abc.abstractmethod
+    def criterion(self, column: Any) -> Criterion:  # ruff: noqa: ANN401
+        """以字段对应的列构造 where 条件"""
+
+    def __invert__(self) -> Q:
+        # Q.__invert__ 会按 children/filters 重建普通 Q, 丢失自定义条件
+        q = copy.copy(self)
+        q.negate()
+        return q
+
+    def resolve(self, model: type[Model], table: Table) -> QueryModifier:
+        criterion = self.criterion(table[model._meta.fields_db_projection[self.field_name]])
+        if self._is_negated:
+            criterion = criterion.negate()
+        return QueryModifier(where_criterion=criterion)
+
+
+class ContainsQ(SpatialQ):
+    """
+    字段包含给定几何: MBRContains 外包矩形预过滤(走 SPATIAL INDEX) + ST_Contains 精确判断
+    """
+
+    def __init__(self, field_name: str, value: Geometry | RawSQL, prefilter: bool = True) -> None:
+        super().__init__(field_name)
+        self.value = value if isinstance(value, RawSQL) else geometry_sql(value)
+        self.prefilter = prefilter
+
+    def criterion(self, column: Any) -> Criterion:  # ruff: noqa: ANN401
+        criterion = _st_contains(column, self.value)
+        if self.prefilter:
+            criterion = _mbr_contains(column, self.value) & criterion
+        return criterion
+
+
+class WithinDistanceQ(SpatialQ):
+    """
+    点位字段与给定点的球面距离不超过 distance 米:
+    以距离换算的经纬度外包矩形预过滤(走 SPATIAL INDEX) + ST_Distance_Sphere 精确判断
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        lng: float,
+        lat: float,
+        distance: float,
+        srid: int = DEFAULT_SRID,
+    ) -> None:
+        super().__init__(field_name)
+        self.point = point_sql(lng, lat, srid)
+        self.distance = distance
+        self.envelope = geometry_sql(envelope(lng, lat, distance, srid))
+
+    def criterion(self, column: Any) -> Criterion:  # ruff: noqa: ANN401
+        return _mbr_contains(self.envelope, column) & (_st_distance_sphere(column, self.point) <= self.distance)
+
+
+def envelope(lng: float, lat: float, distance: float, srid: int = DEFAULT_SRID) -> Geometry:
+    """以点为中心、覆盖 distance 米的经纬度矩形"""
+    delta_lat = distance / METERS_PER_DEGREE
+    delta_lng = distance / (METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+    min_lng, max_lng = max(lng - delta_lng, -180.0), min(lng + delta_lng, 180.0)
+    min_lat, max_lat = max(lat - delta_lat, -90.0), min(lat + delta_lat, 90.0)
+    ring = [[min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat]]
+    return Geometry.from_geojson({"type": "Polygon", "coordinates": [ring]}, srid)
+
+
+def spatial_index_name(table: str, column: str) -> str:
+    return f"sidx_{table}_{column}"
+
+
+def add_spatial_column_sql(
+    table: str,
+    column: str,
+    srid: int = DEFAULT_SRID,
+    geometry_type: str = "GEOMETRY",
+    comment: str = "",
+) -> str:
+    """新增带 SRID 约束的非空几何列及其 SPATIAL INDEX; 已有数据的表需先以可空列写入数据后再用 add_spatial_index_sql"""
+    return f"""
+        ALTER TABLE `{table}` ADD COLUMN `{column}` {geometry_type} NOT NULL SRID {srid} COMMENT '{comment}',
+        ADD SPATIAL INDEX `{spatial_index_name(table, column)}` (`{column}`);"""
+
+
+def drop_spatial_column_sql(table: str, column: str) -> str:
+    return f"""
+        ALTER TABLE `{table}` DROP INDEX `{spatial_index_name(table, column)}`, DROP COLUMN `{column}`;"""
+
+
+def add_spatial_index_sql(
+    table: str,
+    column: str,
+    srid: int = DEFAULT_SRID,
+    geometry_type: str = "GEOMETRY",
+    comment: str = "",
+) -> str:
+    """为已有几何列加上 SRID 约束及 SPATIAL INDEX, 要求列中无 NULL 且 SRID 一致"""
+    return f"""
+        ALTER TABLE `{table}` MODIFY COLUMN `{column}` {geometry_type} NOT NULL SRID {srid} COMMENT '{comment}',
+        ADD SPATIAL INDEX `{spatial_index_name(table, column)}` (`{column}`);"""
+
+
+def drop_spatial_index_sql(table: str, column: str) -> str:
+    return f"""
+        ALTER TABLE `{table}` DROP INDEX `{spatial_index_name(table, column)}`;"""
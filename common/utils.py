@@ -1,3 +1,4 @@
+import os
 import re
 import math
 import uuid
@@ -394,26 +395,25 @@ def swap_uuid_sections(uuid_obj: uuid.UUID, recovery: bool = False) -> bytes:
         再下来2字节(12 d3)是变体号
         最后6字节(a4 56 42 66 14 17 40 00)是唯一性标识符
     """
-    uuid_bytes = uuid_obj.bytes
+    return swap_uuid_bytes(uuid_obj.bytes, recovery)
+
+
+def swap_uuid_bytes(uuid_bytes: bytes, recovery: bool = False) -> bytes:
+    """同 swap_uuid_sections, 直接处理16字节, 与 MySQL UUID_TO_BIN(uuid, 1)/BIN_TO_UUID(bin, 1) 一致"""
     if recovery:
-        swapped_uuid_bytes = uuid_bytes[4:8] + uuid_bytes[2:4] + uuid_bytes[:2] + uuid_bytes[8:]
-    else:
-        swapped_uuid_bytes = uuid_bytes[6:8] + uuid_bytes[4:6] + uuid_bytes[:4] + uuid_bytes[8:]
-    return swapped_uuid_bytes
+        return uuid_bytes[4:8] + uuid_bytes[2:4] + uuid_bytes[:2] + uuid_bytes[8:]
+    return uuid_bytes[6:8] + uuid_bytes[4:6] + uuid_bytes[:4] + uuid_bytes[8:]
 
 
 def uuid_to_bin(uuid_obj: uuid.UUID, swap_flag: Literal[0, 1] = 1) -> bytes:
     if swap_flag == 1:
-        uuid_bytes = swap_uuid_sections(uuid_obj)
-    else:
-        uuid_bytes = uuid_obj.bytes
-    return uuid_bytes
+        return swap_uuid_bytes(uuid_obj.bytes)
+    return uuid_obj.bytes
 
 
 def bin_to_uuid(uuid_bytes: bytes, swap_flag: Literal[0, 1] = 1) -> uuid.UUID:
-    uuid_obj = uuid.UUID(bytes=uuid_bytes)
     if swap_flag == 1:
-        uuid_bytes = swap_uuid_sections(uuid_obj, recovery=True)
+        uuid_bytes = swap_uuid_bytes(uuid_bytes, recovery=True)
     return uuid.UUID(bytes=uuid_bytes)
 
 
@@ -445,9 +445,14 @@ def clean_path(name: str) -> str:
     return clean_name
 
 
+def out_of_china(lng: float, lat: float) -> bool:
+    """中国境外的坐标不做偏移"""
+    return not (72.004 < lng < 137.8347 and 0.8293 < lat < 55.8271)
+
+
 def wgs84_to_gcj02(lng: float, lat: float) -> tuple[float, float]:
     """
-    WGS84转GCJ02(火星坐标系)
+    WGS84转GCJ02(火星坐标系), 批量转换使用 common.coordinate.wgs84_to_gcj02_batch
     :param lng:WGS84坐标系的经度
     :param lat:WGS84坐标系的纬度
     :return:
@@ -470,10 +475,7 @@ def wgs84_to_gcj02(lng: float, lat: float) -> tuple[float, float]:
         ret += (150.0 * math.sin(lng / 12.0 * PI) + 300.0 * math.sin(lng / 30.0 * PI)) * 2.0 / 3.0
         return ret
 
-    if not lng and not lat:
-        return lng, lat
-    # 已经转换过坐标系
-    if len(str(lng)) > 16 or len(str(lat)) > 16:
+    if out_of_china(lng, lat):
         return lng, lat
     dlat = _transformlat(lng - 105.0, lat - 35.0)
     dlng = _transformlng(lng - 105.0, lat - 35.0)
@@ -518,6 +520,9 @@ class PersistentCache(Generic[T]):
             self.cache[key] = value
 
 
+LOCALE_DIR = "locales"
+
+
 class Translator:
     _instances: Dict[str, "Translator"] = {}
     _translations: Dict[str, gettext.GNUTranslations] = {}
@@ -536,19 +541,37 @@ class Translator:
             return self._translations[cache_key]
 
         # Load translations from file
-        translation = gettext.translation(key, localedir="locales", languages=[self.lang])
+        translation = gettext.translation(key, localedir=LOCALE_DIR, languages=[self.lang])
         self._translations[cache_key] = translation
         return translation
 
+    @classmethod
+    def preload(cls) -> None:
+        """加载全部已编译(.mo)的翻译文件"""
+        if not os.path.isdir(LOCALE_DIR):
+            return
+        for lang in os.listdir(LOCALE_DIR):
+            messages_dir = os.path.join(LOCALE_DIR, lang, "LC_MESSAGES")
+            if not os.path.isdir(messages_dir):
+                continue
+            for filename in os.listdir(messages_dir):
+                if filename.endswith(".mo"):
+                    cls(lang).load_translations(filename[:-3])  # type: ignore
+
     def t(self, key: str, message: str, **kwargs: Dict[str, Any]) -> str:
         translated_message = self.load_translations(key).gettext(message)
         return translated_message.format(**kwargs)
 
 
-def list_dict_to_tuple(data: list | dict) -> list:
+def list_dict_to_tuple(data: list | dict, coordinate_transform: Callable | None = None) -> list:
     """
     前端经纬度转换
+    :param coordinate_transform: 坐标系批量转换, 如 common.coordinate.wgs84_to_gcj02_batch
     """
+    if coordinate_transform:
+        from common.coordinate import transform_nested
+
+        data = transform_nested(data, coordinate_transform)
     if isinstance(data, dict):
         return list(data.values())
     result = []
@@ -561,10 +584,15 @@ def list_dict_to_tuple(data: list | dict) -> list:
     return result
 
 
-def list_tuple_to_dict(data: list | tuple) -> list:
+def list_tuple_to_dict(data: list | tuple, coordinate_transform: Callable | None = None) -> list:
     """
     前端经纬度转换
+    :param coordinate_transform: 坐标系批量转换, 如 common.coordinate.wgs84_to_gcj02_batch
     """
+    if coordinate_transform:
+        from common.coordinate import transform_nested
+
+        return transform_nested(list_tuple_to_dict(data), coordinate_transform)
     if isinstance(data, tuple) and len(data) == 2 and all(isinstance(_i, float) for _i in data):
         return [dict(zip(["lng", "lat"], reversed(data)))]
 
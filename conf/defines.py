@@ -1,7 +1,7 @@
 import os
 import enum
 import multiprocessing
-from typing import Self
+from typing import Self, Literal
 from pathlib import Path
 from zoneinfo import ZoneInfo
 from contextlib import asynccontextmanager
@@ -14,6 +14,14 @@ from redis.asyncio import Redis, ConnectionPool
 from redis.backoff import NoBackoff
 
 
+REPLICA_CONNECTION_INFIX = "_replica_"
+
+
+def replica_connection_name(connection_name: str, index: int) -> str:
+    """只读副本的 tortoise 连接名"""
+    return f"{connection_name}{REPLICA_CONNECTION_INFIX}{index}"
+
+
 class EnvironmentEnum(str, enum.Enum):
     local = "local"
     development = "development"
@@ -40,9 +48,19 @@ class ConnectionNameEnum(str, enum.Enum):
 VersionFilePath: str = f"{BASE_DIR}/storages/relational/migrate/"
 
 
+class PoolConfig(BaseModel):
+    minsize: int = 1  # 连接池的最小连接数, 启动时预建立
+    maxsize: int = 10  # 连接池的最大连接数
+    pool_recycle: int = 3600  # 连接的最大存活时间（秒）
+
+
 class Relational(BaseModel):
     user_center: MySQLDsn
     asset_center: MySQLDsn
+    echo: bool = False  # 输出全部SQL, 仅用于调试
+    slow_query_threshold: float | None = 0.5  # 慢查询阈值(秒), 为空时不记录
+    pools: dict[ConnectionNameEnum, PoolConfig] = {}  # 各连接的连接池配置, 未配置的使用默认值
+    replicas: dict[ConnectionNameEnum, list[MySQLDsn]] = {}  # 各连接的只读副本, 读请求随机分发
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -50,40 +68,41 @@ class Relational(BaseModel):
     def timezone(self) -> ZoneInfo:
         return ZoneInfo("Asia/Shanghai")
 
+    def connection_config(self, connection_name: ConnectionNameEnum, dsn: MySQLDsn | None = None) -> dict:
+        dsn = dsn or getattr(self, connection_name.value)
+        pool = self.pools.get(connection_name) or PoolConfig()
+        return {
+            "engine": "common.tortoise.backends.mysql",
+            "credentials": {
+                "host": dsn.host,
+                "port": dsn.port,
+                "user": dsn.username,
+                "password": unquote(dsn.password) if dsn.password else "",
+                "database": dsn.path.strip("/"),  # type: ignore
+                "echo": self.echo,
+                "slow_query_threshold": self.slow_query_threshold,
+                "minsize": pool.minsize,
+                "maxsize": pool.maxsize,
+                "pool_recycle": pool.pool_recycle,
+            },
+        }
+
+    @property
+    def connections_config(self) -> dict:
+        connections = {}
+        for connection_name in ConnectionNameEnum:
+            connections[connection_name.value] = self.connection_config(connection_name)
+            for index, dsn in enumerate(self.replicas.get(connection_name, [])):
+                connections[replica_connection_name(connection_name.value, index)] = self.connection_config(
+                    connection_name,
+                    dsn,
+                )
+        return connections
+
     @property
     def tortoise_orm_config(self) -> dict:
-        echo = True
         return {
-            "connections": {
-                ConnectionNameEnum.user_center.value: {
-                    "engine": "tortoise.backends.mysql",
-                    "credentials": {
-                        "host": self.user_center.host,
-                        "port": self.user_center.port,
-                        "user": self.user_center.username,
-                        "password": unquote(self.user_center.password) if self.user_center.password else "",
-                        "database": self.user_center.path.strip("/"),  # type: ignore
-                        "echo": echo,
-                        "minsize": 1,  # 连接池的最小连接数
-                        "maxsize": 10,  # 连接池的最大连接数
-                        "pool_recycle": 3600,  # 连接的最大存活时间（秒）
-                    },
-                },
-                ConnectionNameEnum.asset_center.value: {
-                    "engine": "tortoise.backends.mysql",
-                    "credentials": {
-                        "host": self.asset_center.host,
-                        "port": self.asset_center.port,
-                        "user": self.asset_center.username,
-                        "password": unquote(self.asset_center.password) if self.asset_center.password else "",
-                        "database": self.asset_center.path.strip("/"),  # type: ignore
-                        "echo": echo,
-                        "minsize": 1,  # 连接池的最小连接数
-                        "maxsize": 10,  # 连接池的最大连接数
-                        "pool_recycle": 3600,  # 连接的最大存活时间（秒）
-                    },
-                },
-            },
+            "connections": self.connections_config,
             "apps": {
                 ConnectionNameEnum.user_center.value: {
                     "models": [
@@ -101,7 +120,7 @@ class Relational(BaseModel):
             },
             # "use_tz": True,   # Will Always Use UTC as Default Timezone
             "timezone": "Asia/Shanghai",
-            # 'routers': ['path.router1', 'path.router2'],
+            "routers": ["common.tortoise.router.ReadReplicaRouter"] if self.replicas else [],
         }
 
 
@@ -160,6 +179,29 @@ class CorsConfig(BaseModel):
 class ProfilingConfig(BaseModel):
     secret: str
     interval: float = 0.001
+    sample_rate: float = 0.0  # 持续采样的请求比例, 0 为关闭
+    max_concurrent: int = 2  # 同时采样的请求数上限
+    window: int = 600  # 聚合窗口/秒
+    uri: str = "/_profiling"  # 聚合结果, 需携带 secret
+
+
+class HealthConfig(BaseModel):
+    interval: float = 10  # 后台依赖检查间隔/秒
+    timeout: float = 3  # 单项检查超时/秒
+    stale_after: float = 60  # 检查结果超过该时长未更新视为未就绪
+    livez_uri: str = "/livez"  # 存活探针, 不访问依赖
+    readyz_uri: str = "/readyz"  # 就绪探针, 返回缓存的依赖检查结果, 未就绪时状态码 503
+
+
+class ResponseEncryptionConfig(BaseModel):
+    secret: str
+
+
+class SignatureConfig(BaseModel):
+    secret: str
+    path_prefixes: list[str] = []  # 需要签名校验的路径前缀
+    expire_seconds: int = 300  # 时间戳有效期
+    replay_protection: bool = True  # 随机数防重放, 依赖redis
 
 
 class ServiceStringConfig(BaseModel):
@@ -171,7 +213,16 @@ class Server(BaseModel):
     address: HttpUrl = HttpUrl("http://0.0.0.0:8000")
     cors: CorsConfig = CorsConfig()
     worker_number: int = multiprocessing.cpu_count() * int(os.getenv("WORKERS_PER_CORE", "2")) + 1
+    worker_class: str | None = None  # gunicorn worker 类路径, 为空时使用按 loop/http 配置的 uvicorn worker
+    loop: Literal["auto", "asyncio", "uvloop"] = "auto"  # auto: 已安装 uvloop 时使用 uvloop
+    http: Literal["auto", "h11", "httptools"] = "auto"  # auto: 已安装 httptools 时使用 httptools
+    preload: bool = True  # fork 前在 master 中构建 OpenAPI、权限表等只读状态并 gc.freeze, 使 worker 共享内存页
     profiling: ProfilingConfig | None = None
+    response_encryption: ResponseEncryptionConfig | None = None
+    signature: SignatureConfig | None = None
+    server_timing: bool = False  # 响应头 Server-Timing 输出请求内各后端调用耗时
+    metrics_uri: str | None = "/metrics"  # Prometheus 指标, 为空时不开启
+    health: HealthConfig = HealthConfig()
     allow_hosts: list = ["*"]
     static_path: str = "/static"
     docs_uri: str = "/docs"
@@ -184,6 +235,15 @@ class Server(BaseModel):
     )
 
 
+class LogConfig(BaseModel):
+    buffer_size: int = 8192  # 日志环形缓冲区大小
+    batch_size: int = 256  # 批量写出条数
+    flush_interval: float = 0.5  # 批量写出间隔(秒)
+    overflow_policy: Literal["drop_oldest", "drop_newest"] = "drop_oldest"
+    access_log_rate: float | None = None  # 访问日志每秒条数限制, 失败请求不受限
+    access_log_burst: int = 100
+
+
 class Project(BaseModel):
     unique_code: ServiceStringConfig = ServiceStringConfig(
         user_center="UserCenter",
@@ -192,6 +252,7 @@ class Project(BaseModel):
     debug: bool = False
     environment: EnvironmentEnum = EnvironmentEnum.production
     sentry_dsn: HttpUrl | None = None
+    log: LogConfig = LogConfig()
 
     class SwaggerServerConfig(BaseModel):
         url: HttpUrl
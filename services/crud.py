@@ -17,6 +17,8 @@ from conf.config import local_configs
 from common.types import end_date_or_datetime, start_date_or_datetime
 from common.schemas import CRUDPager
 from common.pydantic import create_sub_fields_model
+from common.tortoise.router import replica_reads
+from common.tortoise.prefetch import prefetch_plan
 from common.responses import Resp
 from services.exceptions import ApiException
 from services.dependencies import paginate
@@ -45,8 +47,10 @@ async def get_all(
     queryset: QuerySet[ModelType],  # type: ignore
     pagination: CRUDPager,
     *args: Q,
+    trusted: bool = False,
     **kwargs: dict,
 ) -> tuple[list, int]:  # type: ignore
+    """trusted: 只读列表使用 from_queryset_trusted, 跳过模型实例化及校验"""
     queryset = queryset.filter(*args).filter(**kwargs).order_by(*pagination.order_by)
 
     search = pagination.search
@@ -66,24 +70,20 @@ async def get_all(
             pagination.selected_fields,
         )
 
-    data = await list_schema.from_queryset(
-        queryset.offset(pagination.offset).limit(pagination.limit),
-    )
-    total = await queryset.count()
+    from_queryset = list_schema.from_queryset_trusted if trusted else list_schema.from_queryset
+    with replica_reads():
+        data = await from_queryset(
+            queryset.offset(pagination.offset).limit(pagination.limit),
+        )
+        total = await queryset.count()
     return data, total
 
 
 async def obj_prefetch_fields(obj: Model, schema: type[PydanticModelType]) -> Model:
     db_model = obj.__class__
-    _db2fields = defaultdict(list)
-    for f in db_model._meta.fetch_fields.intersection(set(schema.model_fields.keys())):
-        _db2fields[db_model._meta.fields_map[f].related_model._meta.db].append(f)  # type: ignore
-
-    for db, fetch_fields in _db2fields.items():
-        await obj.fetch_related(
-            *fetch_fields,
-            using_db=db,
-        )
+    # 按关联模型所在库分组, 不同库并发
+    fetch_fields = db_model._meta.fetch_fields.intersection(set(schema.model_fields.keys()))
+    await prefetch_plan(db_model, fetch_fields, join=False).prefetch([obj])
     return obj
 
 
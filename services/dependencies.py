@@ -1,12 +1,10 @@
 from typing import Annotated
 from collections.abc import Callable
 
-from jose import JWTError, ExpiredSignatureError, jwt
 from loguru import logger
 from fastapi import Body, Query, Depends, Request
 from pydantic import PositiveInt
 from cachetools import TTLCache
-from jose.exceptions import JWTClaimsError
 from tortoise.models import Model
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.security.utils import get_authorization_scheme_param
@@ -16,6 +14,7 @@ from conf.config import local_configs
 from common.enums import ResponseCodeEnum
 from common.encrypt import JwtUtil
 from common.schemas import Pager, CRUDPager
+from common.permission import PermissionMatcher, permission_matcher_cache
 from services.exceptions import ApiException
 from common.constant.messages import (
     AuthorizationHeaderInvalidMsg,
@@ -154,6 +153,10 @@ async def _validate_jwt_token(
     request: Request,
     token: HTTPAuthorizationCredentials,
 ) -> Account:
+    # jose 及其 cryptography 依赖较重, 首次校验 token 时才导入
+    from jose import JWTError, ExpiredSignatureError, jwt
+    from jose.exceptions import JWTClaimsError
+
     try:
         token_value = token.credentials
         kid = jwt.get_unverified_header(token_value).get("kid", "rsa1")
@@ -208,6 +211,15 @@ class TokenRequired:
 token_required = TokenRequired()
 
 
+async def _get_permission_matcher(account: Account) -> PermissionMatcher:
+    # 按账户缓存已编译的权限集合, 权限变更时经 permission_matcher_cache.invalidate 通知失效
+    matcher = permission_matcher_cache.get(account.id)
+    if matcher is None:
+        matcher = PermissionMatcher(await account.get_permission_codes())
+        permission_matcher_cache.set(account.id, matcher)
+    return matcher
+
+
 class ApiPermissionCheck:
     def __init__(
         self,
@@ -226,17 +238,15 @@ class ApiPermissionCheck:
         if account.is_super_admin:
             return account
 
-        method = request.method
-        root_path: str = request.scope["root_path"]
-        path: str = request.scope["route"].path
-
-        if await account.has_permission(
-            [
-                "*",
-                f"{request.app.code}:*",
-                f"{request.app.code}:{method}:{root_path}{path}",
-            ],
-        ):
+        app = request.app
+        route_code = app.route_permission_table.get(
+            request.scope["root_path"],
+            request.method,
+            request.scope["route"].path,
+        )
+
+        matcher = await _get_permission_matcher(account)
+        if matcher.match(app.code, route_code):
             return account
 
         raise ApiException(
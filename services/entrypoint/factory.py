@@ -1,23 +1,10 @@
-from aerich import Command
-
 from conf.config import local_configs
-from conf.defines import VersionFilePath, ConnectionNameEnum
 from common.fastapi import ServiceApi
 from services.user_center.factory import user_center_api
 
 
 class RootApi(ServiceApi):
-    async def before_server_start(self) -> None:
-        for connection_name in ConnectionNameEnum:
-            if connection_name.value == "default":
-                continue
-            command = Command(
-                tortoise_config=self.settings.relational.tortoise_orm_config,
-                app=connection_name.value,
-                location=VersionFilePath,
-            )
-            await command.init()
-            await command.upgrade(run_in_transaction=True)
+    ...
 
 
 description = """
@@ -1,5 +1,7 @@
+import gc
 import os
 import sys
+import time
 import signal
 import logging
 import argparse
@@ -8,14 +10,14 @@ from typing import Any
 
 sys.path.append(".")  # 将当前目录加入到环境变量中
 
-import asyncio  # noqa
-
 import gunicorn.app.base  # type:ignore
 from loguru import logger  # type:ignore
+from uvicorn.workers import UvicornWorker
 
 # from common.log import setup_loguru
 from conf.config import local_configs  # noqa
 from common.fastapi import ServiceApi
+from common.metrics import process_memory
 
 """FastAPI"""
 
@@ -34,6 +36,12 @@ def setup_logging():
     signal.signal(signal.SIGTERM, handle_sigterm)
 
 
+class ConfiguredUvicornWorker(UvicornWorker):
+    """按 server.loop / server.http 选择事件循环与 HTTP 解析器"""
+
+    CONFIG_KWARGS = {"loop": local_configs.server.loop, "http": local_configs.server.http}
+
+
 class FastApiApplication(gunicorn.app.base.BaseApplication):
     def __init__(self, app: ServiceApi, options: dict | None = None) -> None:
         self.options = options or {}
@@ -72,7 +80,8 @@ def post_fork(server: Any, worker: Any) -> None:  # ruff: noqa
 
     #     agent.start()
     # setup_logging()
-    ...
+    # worker 启动耗时从 fork 开始计算, 在 lifespan 初始化完成后输出
+    worker.app.application.worker_forked_at = time.perf_counter()
 
 
 # Pre-fork hook to setup logging before workers are forked
@@ -81,6 +90,15 @@ def pre_fork(server, worker):
     # setup_logging()
 
 
+def preload(app: ServiceApi) -> None:
+    """master 中构建只读状态后冻结 gc, fork 出的 worker 以写时复制共享这部分内存"""
+    start = time.perf_counter()
+    app.preload()
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded in master {time.perf_counter() - start:.3f}s, memory(KB): {process_memory()}")
+
+
 def import_app(app_path: str) -> ServiceApi:
     if ":" not in app_path:
         raise ValueError("Invalid app_path format. It should be in the format'module:app'.")
@@ -101,6 +119,8 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     app = import_app(args.app_path)
+    if local_configs.server.preload:
+        preload(app)
 
     # gunicorn core.factory:app
     # --workers 4
@@ -113,23 +133,22 @@ if __name__ == "__main__":
     # --logger-class core.loguru.GunicornLogger
     # --bind 0.0.0.0:80
     # import sys
-    if hasattr(app, "before_server_start"):
-        asyncio.get_event_loop().run_until_complete(app.before_server_start())
+    # 数据库迁移在部署时单独执行: python services/entrypoint/migrate.py
 
     options = {
         "bind": f"{local_configs.server.address.host}:{local_configs.server.address.port}",
         "workers": local_configs.server.worker_number,
-        # "worker_class": "uvicorn.workers.UvicornWorker",
-        "worker_class": "uvicorn.workers.UvicornH11Worker",
+        "worker_class": local_configs.server.worker_class or ConfiguredUvicornWorker,
         "debug": local_configs.project.debug,
         "log_level": "debug" if local_configs.project.debug else "info",
         "max_requests": 4096,  # # 最大请求数之后重启worker，防止内存泄漏
         "max_requests_jitter": 512,  # 随机重启防止所有worker一起重启：randint(0, max_requests_jitter)
         "graceful_timeout": 120,
         "timeout": 180,
+        "preload_app": local_configs.server.preload,
+        "post_fork": post_fork,
         # "logger_class": "common.log.GunicornLogger",
         # "config": "entrypoint.gunicorn_conf.py",
-        # "post_fork": "entrypoint.main.post_fork",
     }
 
     FastApiApplication(app, options).run()
@@ -0,0 +1,150 @@
+"""
+数据库迁移, 部署时在启动服务前单独执行一次, 服务进程启动时不再做任何迁移
+
+python services/entrypoint/migrate.py                      # 迁移全部 app
+python services/entrypoint/migrate.py --app user_center
+python services/entrypoint/migrate.py --check              # 仅检查, 有未执行的迁移时退出码为 1
+
+1. 直接读取 aerich 版本表与迁移目录对比, 已是最新时不导入模型、不初始化 Tortoise, 直接退出
+2. 否则以 MySQL GET_LOCK 加锁(连接断开时自动释放), 多副本同时部署时只有一个执行迁移, 其余等待后复查
+"""
+import os
+import sys
+import asyncio
+import argparse
+from typing import Any
+
+sys.path.append(".")  # 将当前目录加入到环境变量中
+
+import aiomysql  # noqa: E402
+from aerich import Command  # noqa: E402
+from loguru import logger  # noqa: E402
+from tortoise import Tortoise  # noqa: E402
+from pymysql.constants import ER  # noqa: E402
+
+from conf.config import local_configs  # noqa: E402
+from conf.defines import VersionFilePath, ConnectionNameEnum  # noqa: E402
+
+AERICH_MODELS = "aerich.models"
+LOCK_NAME = "aerich_migrate"
+
+
+def version_files(app: str) -> list[str]:
+    """与 aerich Migrate.get_all_version_files 一致"""
+    location = os.path.join(VersionFilePath, app)
+    if not os.path.isdir(location):
+        return []
+    return sorted(
+        (f for f in os.listdir(location) if f.endswith("py")),
+        key=lambda x: int(x.split("_")[0]),
+    )
+
+
+def aerich_connection_name(tortoise_config: dict) -> str:
+    """aerich 版本表所在的连接"""
+    for app in tortoise_config["apps"].values():
+        if AERICH_MODELS in app["models"]:
+            return app["default_connection"]
+    raise RuntimeError(f"{AERICH_MODELS} is not registered in any app")
+
+
+async def connect(connection_name: str) -> aiomysql.Connection:
+    credentials = local_configs.relational.connection_config(ConnectionNameEnum(connection_name))["credentials"]
+    return await aiomysql.connect(
+        host=credentials["host"],
+        port=credentials["port"],
+        user=credentials["user"],
+        password=credentials["password"],
+        db=credentials["database"],
+        autocommit=True,
+    )
+
+
+async def pending_versions(conn: aiomysql.Connection, apps: list[str]) -> dict[str, list[str]]:
+    """各 app 未执行的迁移文件"""
+    applied: set[tuple[str, str]] = set()
+    async with conn.cursor() as cursor:
+        try:
+            await cursor.execute("SELECT `app`, `version` FROM `aerich`")
+            applied = {(app, version) for app, version in await cursor.fetchall()}
+        except aiomysql.ProgrammingError as e:
+            # 首次部署, 版本表尚未创建
+            if e.args[0] != ER.NO_SUCH_TABLE:
+                raise
+    pending = {app: [v for v in version_files(app) if (app, v) not in applied] for app in apps}
+    return {app: versions for app, versions in pending.items() if versions}
+
+
+async def fetch_one(conn: aiomysql.Connection, sql: str, args: Any) -> Any:  # ruff: noqa: ANN401
+    async with conn.cursor() as cursor:
+        await cursor.execute(sql, args)
+        row = await cursor.fetchone()
+    return row[0] if row else None
+
+
+async def upgrade(apps: list[str]) -> None:
+    tortoise_config = local_configs.relational.tortoise_orm_config
+    try:
+        for app in apps:
+            command = Command(tortoise_config=tortoise_config, app=app, location=VersionFilePath)
+            await command.init()
+            migrated = await command.upgrade(run_in_transaction=True)
+            logger.info(f"Migrated {app}: {migrated}")
+    finally:
+        await Tortoise.close_connections()
+
+
+async def migrate(apps: list[str], check: bool, lock_timeout: int) -> int:
+    conn = await connect(aerich_connection_name(local_configs.relational.tortoise_orm_config))
+    try:
+        pending = await pending_versions(conn, apps)
+        if not pending:
+            logger.info("Database schema is up to date")
+            return 0
+        logger.info(f"Pending migrations: {pending}")
+        if check:
+            return 1
+
+        locked = await fetch_one(conn, "SELECT GET_LOCK(%s, %s)", (LOCK_NAME, lock_timeout))
+        if locked != 1:
+            logger.error(f"Acquire migration lock timeout after {lock_timeout}s")
+            return 1
+        try:
+            # 等锁期间可能已由其他副本完成
+            pending = await pending_versions(conn, apps)
+            if pending:
+                await upgrade(list(pending))
+            else:
+                logger.info("Migrated by another process")
+        finally:
+            await fetch_one(conn, "SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run database migrations before starting servers.")
+    parser.add_argument(
+        "--app",
+        action="append",
+        choices=[i.value for i in ConnectionNameEnum],
+        help="Apps to migrate, all apps by default",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check, exit with 1 if there are pending migrations",
+    )
+    parser.add_argument("--lock-timeout", type=int, default=600, help="Seconds to wait for the migration lock")
+    args = parser.parse_args()
+
+    sys.exit(
+        asyncio.run(
+            migrate(
+                args.app or [i.value for i in ConnectionNameEnum],
+                args.check,
+                args.lock_timeout,
+            ),
+        ),
+    )
@@ -1,9 +1,14 @@
+import hmac
+import time
+
 from loguru import logger
 from pyinstrument import Profiler
 from fastapi.responses import HTMLResponse
 from starlette_context import request_cycle_context
 from starlette.requests import Request, HTTPConnection
+from starlette.types import Send, Scope, ASGIApp, Message, Receive
 from starlette.responses import Response
+from starlette.datastructures import Headers
 from fastapi.middleware.gzip import GZipMiddleware
 from starlette.middleware.base import RequestResponseEndpoint
 from starlette.middleware.cors import CORSMiddleware
@@ -11,12 +16,20 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from starlette_context.plugins.base import Plugin
 
 from conf.config import local_configs
+from common.enums import ResponseCodeEnum, RequestHeaderKeyEnum
+from conf.defines import SignatureConfig, ConnectionNameEnum
 from common.context import (
     RequestIdPlugin,
+    RequestStatsPlugin,
     RequestProcessInfoPlugin,
     RequestStartTimestampPlugin,
 )
+from common.encrypt import SignAuth
+from common.profiling import request_sampler
 from common.decorators import SingletonClassMeta
+from services.exceptions import ApiException, api_exception_handler
+from storages.redis.keys import RedisCacheKey
+from common.constant.messages import SignCheckErrorMsg, TimestampExpiredMsg
 
 
 async def contex_middleware(
@@ -55,7 +68,7 @@ async def contex_middleware(
                 if (
                     profile_secret
                     and local_configs.server.profiling
-                    and profile_secret == local_configs.server.profiling.secret
+                    and hmac.compare_digest(profile_secret.encode(), local_configs.server.profiling.secret.encode())
                 ):
                     profiler = Profiler(
                         interval=local_configs.server.profiling.interval,
@@ -65,7 +78,15 @@ async def contex_middleware(
                     await call_next(request)
                     profiler.stop()
                     return HTMLResponse(profiler.output_html())
-                response = await call_next(request)
+                sampled_profiler = request_sampler.start()
+                if sampled_profiler is None:
+                    response = await call_next(request)
+                else:
+                    try:
+                        response = await call_next(request)
+                    finally:
+                        route = request.scope.get("route")
+                        request_sampler.stop(sampled_profiler, getattr(route, "path", None) or "<unmatched>")
                 await self.enrich_response(response)
                 return response
 
@@ -73,6 +94,10 @@ async def contex_middleware(
         plugins=[
             RequestStartTimestampPlugin(),
             RequestIdPlugin(),
+            RequestStatsPlugin(
+                server_timing=local_configs.server.server_timing,
+                route_metrics_enabled=bool(local_configs.server.metrics_uri),
+            ),
             RequestProcessInfoPlugin(),
         ],
     )
@@ -80,6 +105,88 @@ async def contex_middleware(
     return await _context_middleware(request, call_next)
 
 
+class SignatureMiddleware:
+    """内部回调接口签名校验
+
+    接收请求体时逐块计算 HMAC, 不重新序列化请求体; 校验通过后才调用应用, 并将已接收的请求体回放给应用;
+    随机数在签名校验通过后才记录, 无效签名无法占用随机数
+    """
+
+    def __init__(self, app: ASGIApp, config: SignatureConfig | None = None) -> None:
+        self.app = app
+        self.config = config
+        self.sign_auth = SignAuth(config.secret) if config else None
+        self.path_prefixes = tuple(config.path_prefixes) if config else ()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.sign_auth or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        sign = headers.get(RequestHeaderKeyEnum.signature.value, "")
+        timestamp = headers.get(RequestHeaderKeyEnum.timestamp.value, "")
+        nonce = headers.get(RequestHeaderKeyEnum.nonce.value, "")
+
+        error_message = self.check_timestamp(timestamp, nonce)
+        if error_message:
+            await self.reject(scope, receive, send, error_message)
+            return
+
+        hasher = self.sign_auth.body_hmac(timestamp, nonce)
+        messages: list[Message] = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            messages.append(message)
+            hasher.update(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+
+        if not self.sign_auth.verify_body_sign(sign, hasher):
+            await self.reject(scope, receive, send, SignCheckErrorMsg)
+            return
+        if not await self.record_nonce(timestamp, nonce):
+            await self.reject(scope, receive, send, SignCheckErrorMsg)
+            return
+
+        async def replay_receive() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    @staticmethod
+    async def reject(scope: Scope, receive: Receive, send: Send, message: str) -> None:
+        response = await api_exception_handler(
+            Request(scope),
+            ApiException(message=message, code=ResponseCodeEnum.unauthorized.value),
+        )
+        await response(scope, receive, send)
+
+    def check_timestamp(self, timestamp: str, nonce: str) -> str | None:
+        if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > self.config.expire_seconds:  # type: ignore
+            return TimestampExpiredMsg
+        if self.config.replay_protection and not nonce:  # type: ignore
+            return SignCheckErrorMsg
+        return None
+
+    async def record_nonce(self, timestamp: str, nonce: str) -> bool:
+        """签名校验通过后记录随机数, 已存在时为重放请求"""
+        if not self.config.replay_protection:  # type: ignore
+            return True
+        async with local_configs.redis.get_redis(ConnectionNameEnum.user_center) as r:
+            is_new = await r.set(
+                RedisCacheKey.sign_nonce.value.format(nonce=nonce),
+                timestamp,
+                ex=self.config.expire_seconds * 2,  # type: ignore
+                nx=True,
+            )
+        return bool(is_new)
+
+
 roster = [
     # >>>>> Middleware Func
     contex_middleware,
@@ -95,6 +202,8 @@ roster = [
             "expose_headers": local_configs.server.cors.expose_headers,
         },
     ),
+    # 位于 CORS 之后, 预检请求由 CORS 直接响应, 不做签名校验
+    (SignatureMiddleware, {"config": local_configs.server.signature}),
     (
         TrustedHostMiddleware,
         {
@@ -1,13 +1,16 @@
+from functools import partial
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
 
-from aerich import Command
 from fastapi import FastAPI
 from tortoise import Tortoise
 
 from conf.config import local_configs
-from conf.defines import VersionFilePath, ConnectionNameEnum
+from conf.defines import ConnectionNameEnum
+from common.health import tcp_check, health_checker
+from common.permission import permission_matcher_cache
 from common.fastapi import ServiceApi
+from common.tortoise.backends.mysql import pool_stats, warm_up_pools
 from services.exceptions import roster as exception_handler_roster
 from services.middlewares import roster as middleware_roster
 from services.user_center.v1 import router as v1_router
@@ -21,6 +24,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
 
     # tortoise
     await Tortoise.init(config=app.settings.relational.tortoise_orm_config)
+    await warm_up_pools()
 
     # pre-check
     for connection in ConnectionNameEnum:
@@ -33,20 +37,48 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     ) as client:
         await client.execute("SELECT 1")
 
+    app.setup_route_permission_table()
+    await health_checker.start()
+    permission_matcher_cache.start(partial(local_configs.redis.get_redis, ConnectionNameEnum.user_center))
+    app.report_worker_ready()
+
     yield
 
+    await permission_matcher_cache.stop()
+    await health_checker.stop()
     await Tortoise.close_connections()
 
 
+async def check_mysql(connection: ConnectionNameEnum) -> None:
+    await Tortoise.get_connection(connection.value).execute_query("SELECT 1")
+
+
+async def check_redis(connection: ConnectionNameEnum) -> None:
+    async with local_configs.redis.get_redis(connection) as r:
+        await r.ping()
+
+
+async def check_clickhouse() -> None:
+    async with get_clickhouse_client(
+        local_configs.clickhouse.url,
+        local_configs.clickhouse.username,
+        local_configs.clickhouse.password,
+    ) as client:
+        await client.execute("SELECT 1")
+
+
+def register_health_checks() -> None:
+    for connection in ConnectionNameEnum:
+        health_checker.register(f"mysql.{connection.value}", partial(check_mysql, connection))
+        health_checker.register(f"redis.{connection.value}", partial(check_redis, connection))
+    health_checker.register("clickhouse", check_clickhouse)
+    # thrift 客户端为同步实现, 仅检查各服务地址可连通
+    for server in local_configs.hbase.servers:
+        health_checker.register(f"hbase.{server}", partial(tcp_check, server, local_configs.server.health.timeout))
+
+
 class UserCenterServiceApi(ServiceApi):
-    async def before_server_start(self) -> None:
-        command = Command(
-            tortoise_config=self.settings.relational.tortoise_orm_config,
-            app=ConnectionNameEnum.user_center.value,
-            location=VersionFilePath,
-        )
-        await command.init()
-        await command.upgrade(run_in_transaction=True)
+    schema_packages = ("storages.relational.schema",)
 
 
 user_center_api = UserCenterServiceApi(
@@ -75,13 +107,15 @@ user_center_api.setup_exception_handlers(roster=exception_handler_roster)
 
 user_center_api.amount_app_or_router(roster=[(v1_router, "", "v1")])
 user_center_api.amount_app_or_router(roster=[(v2_router, "", "v2")])
+user_center_api.setup_metrics_endpoint()
+user_center_api.setup_profiling()
+user_center_api.setup_health_endpoints()
+register_health_checks()
 
 
 @user_center_api.get("/health", summary="健康检查")
 async def health() -> dict:
     """
-    健康检查
+    健康检查, 返回后台缓存的依赖检查结果, 不直接访问依赖; 探针使用 /livez 与 /readyz
     """
-    for connection in ConnectionNameEnum:
-        await Tortoise.get_connection(connection.value).execute_query("SELECT 1")
-    return {"status": "ok"}
+    return {**health_checker.report(), "pools": pool_stats()}
@@ -49,7 +49,12 @@ async def get_account(
         1000,
     ),
 ) -> Resp[PageData[AccountList]]:
-    return await get_all(Account.all(), pager, **filter_schema.model_dump(exclude_unset=True, exclude_none=True))
+    return await get_all(
+        Account.all(),
+        pager,
+        trusted=True,
+        **filter_schema.model_dump(exclude_unset=True, exclude_none=True),
+    )
 
 
 @router.patch(
@@ -1,20 +1,47 @@
+import time
+from typing import TYPE_CHECKING, Any
+from functools import cache
 from contextlib import asynccontextmanager
 from collections.abc import AsyncGenerator
 
-import httpx
 from loguru import logger
-from aiochclient import ChClient  # type: ignore
 
-timeout = httpx.Timeout(5.0, connect=10.0)
-limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
+from common.enums import BackendKindEnum
+from common.context import record_backend_call
+
+if TYPE_CHECKING:
+    # aiochclient 及 httpx 在首次访问 ClickHouse 时才导入, 不使用 ClickHouse 的服务启动时不加载
+    from aiochclient import ChClient  # type: ignore
+
+
+@cache
+def instrumented_client_class() -> type["ChClient"]:
+    from aiochclient import ChClient  # type: ignore
+
+    class InstrumentedChClient(ChClient):
+        """execute/fetch/iterate 等均经由 _execute, 在此计入请求内 clickhouse 调用统计"""
+
+        async def _execute(self, *args, **kwargs) -> AsyncGenerator[Any, None]:  # ruff: noqa: ANN401
+            start = time.perf_counter()
+            try:
+                async for record in super()._execute(*args, **kwargs):
+                    yield record
+            finally:
+                record_backend_call(BackendKindEnum.clickhouse, "", time.perf_counter() - start)
+
+    return InstrumentedChClient
 
 
 @asynccontextmanager
-async def get_clickhouse_client(url: str, username: str, password: str) -> AsyncGenerator[ChClient, None]:
+async def get_clickhouse_client(url: str, username: str, password: str) -> AsyncGenerator["ChClient", None]:
+    import httpx
+
+    timeout = httpx.Timeout(5.0, connect=10.0)
+    limits = httpx.Limits(max_keepalive_connections=10, max_connections=20)
     ch_client = None
     try:
         async with httpx.AsyncClient(timeout=timeout, limits=limits) as http_client:
-            ch_client = ChClient(http_client, url=url, user=username, password=password)
+            ch_client = instrumented_client_class()(http_client, url=url, user=username, password=password)
             yield ch_client
     except Exception as e:
         logger.error(f"Error connecting to Clickhouse: {e}")
@@ -1,17 +1,21 @@
+import time
 import random
-from typing import Generic, TypeVar
+from typing import TYPE_CHECKING, Generic, TypeVar
 from collections import defaultdict
 from collections.abc import Iterable, AsyncGenerator
 
 import six  # type: ignore
 from pydantic import Field, BaseModel
-from thbase.config import ClientConfig, ProtocolType, TransportType  # type: ignore
-from thbase.thrift2.client import Client  # type: ignore
-from thbase.thrift2.operation import Get, Scan, _column_format  # type: ignore
 
 from conf.config import local_configs
+from common.enums import BackendKindEnum
+from common.context import record_backend_call
 from common.pydantic import create_sub_fields_model
 
+if TYPE_CHECKING:
+    # thbase(thrift) 在首次访问 HBase 时才导入, 不使用 HBase 的服务启动时不加载
+    from thbase.thrift2.client import Client  # type: ignore
+
 
 def get_random_host_and_port(servers: list[str]) -> tuple[str, str]:
     if not servers:
@@ -41,7 +45,10 @@ def bytes_increment(b: bytes) -> bytes | None:
 
 def get_thrift2_client(
     servers: list[str] = local_configs.hbase.servers,
-) -> Client:
+) -> "Client":
+    from thbase.config import ClientConfig, ProtocolType, TransportType  # type: ignore
+    from thbase.thrift2.client import Client  # type: ignore
+
     host, port = get_random_host_and_port(servers)
     conf = ClientConfig(
         thrift_host=host,
@@ -219,6 +226,8 @@ class HBaseORM(BaseModel, Generic[DataT]):
                 row_start = row_prefix
                 row_stop = bytes_increment(row_prefix)
 
+        from thbase.thrift2.operation import Scan, _column_format  # type: ignore
+
         t_scan = Scan(
             start_row=row_start,
             stop_row=row_stop,
@@ -242,10 +251,12 @@ class HBaseORM(BaseModel, Generic[DataT]):
         for _ in range(cls.Meta.retry_times):
             try:
                 client = get_thrift2_client()
+                start = time.perf_counter()
                 results = client._scan(
                     table_name=cls.Meta.table.encode(),
                     scan=t_scan,
                 )
+                record_backend_call(BackendKindEnum.hbase, "", time.perf_counter() - start)
                 client.close_connection()
                 if not results or len(results) == 0:
                     return
@@ -281,6 +292,8 @@ class HBaseORM(BaseModel, Generic[DataT]):
             columns = [mf.alias.encode() for mf in cls.model_fields.values() if mf.alias != "row_key"]
         exc: Exception | None = None
 
+        from thbase.thrift2.operation import Get  # type: ignore
+
         # batch get operation
         get_list = []
         for row_key in row_key_list:
@@ -289,8 +302,12 @@ class HBaseORM(BaseModel, Generic[DataT]):
         for _ in range(cls.Meta.retry_times):
             try:
                 client = get_thrift2_client()
+                start = time.perf_counter()
                 results = client._get_rows(table_name=cls.Meta.table.encode(), gets=get_list)
+                record_backend_call(BackendKindEnum.hbase, "", time.perf_counter() - start)
                 client.close_connection()
+                exc = None
+                break
             except Exception as e:
                 exc = e
 
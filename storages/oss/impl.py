@@ -1,13 +1,14 @@
 from conf.config import local_configs
 from common.utils import normalize_url
 from conf.defines import EnvironmentEnum
-from common.oss.file import OssFile
-from common.tortoise import StorageMixin
+from common.oss.file import OssFile, AsyncOssFile
+from common.tortoise.fields.base import StorageMixin
 from common.decorators import SingletonClassMeta
 
 
 class XxxOss(
     OssFile,
+    AsyncOssFile,
     StorageMixin,
     metaclass=SingletonClassMeta["XxxOss"],  # type: ignore
 ):
@@ -0,0 +1,10 @@
+from enum import unique
+
+from common.types import StrEnumMore
+
+
+@unique
+class RedisCacheKey(StrEnumMore):
+    """Redis 缓存key"""
+
+    sign_nonce = ("SignNonce:{nonce}", "签名请求随机数, 防重放")
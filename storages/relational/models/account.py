@@ -33,6 +33,13 @@ class Account(BaseModel):
     )
     name = fields.CharField(max_length=50, description="账户名称")
 
+    async def get_permission_codes(self) -> set[str]:
+        """
+        账户拥有的权限编码, 未接入角色权限表时为空
+        权限变更后需调用 permission_matcher_cache.invalidate 使各 worker 中已编译的权限集合失效
+        """
+        return set()
+
     class Meta:
         table_description = "账户"
         ordering = ["-id"]
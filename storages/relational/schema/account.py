@@ -1,6 +1,5 @@
-from tortoise.contrib.pydantic import pydantic_model_creator
-
 from common.pydantic import CommonConfigDict, optional
+from common.tortoise.contrib.pydantic.creator import pydantic_model_creator
 from storages.relational.models.account import Account, Company
 
 
@@ -0,0 +1,53 @@
+"""GeometryField 的坐标系转换只作用于外部输入, 读出的 Geometry 再次保存时不重复转换"""
+from collections.abc import AsyncIterator
+
+import pytest
+from tortoise import Tortoise, fields
+from tortoise.models import Model
+
+from common.tortoise.fields.base import GeometryField
+
+coordinate = pytest.importorskip("common.coordinate")
+
+
+class Place(Model):
+    id = fields.IntField(pk=True)
+    name = fields.CharField(max_length=32)
+    location = GeometryField(coordinate_transform=coordinate.wgs84_to_gcj02_batch)
+
+    class Meta:
+        app = "geometry_test"
+
+
+@pytest.fixture()
+async def database() -> AsyncIterator[None]:
+    await Tortoise.init(
+        config={
+            "connections": {"default": "sqlite://:memory:"},
+            "apps": {"geometry_test": {"models": [__name__], "default_connection": "default"}},
+        },
+    )
+    await Tortoise.generate_schemas()
+    yield
+    await Tortoise.close_connections()
+
+
+@pytest.mark.anyio
+async def test_round_trip_does_not_shift_coordinates(database: None) -> None:
+    point = {"type": "Point", "coordinates": [116.397428, 39.90923]}
+    created = await Place.create(name="tiananmen", location=point)
+
+    loaded = await Place.get(id=created.id)
+    # 外部输入的 GeoJSON 入库前已转换
+    assert list(loaded.location.coordinates) != point["coordinates"]
+    expected = coordinate.wgs84_to_gcj02_batch([point["coordinates"]])[0]
+    assert list(loaded.location.coordinates) == pytest.approx(list(expected))
+
+    loaded.name = "renamed"
+    await loaded.save()
+    reloaded = await Place.get(id=created.id)
+    assert reloaded.location == loaded.location
+
+    # 以读出的 Geometry 作为过滤值时同样不做转换
+    field = Place._meta.fields_map["location"]
+    assert field.to_db_value(loaded.location, Place) == loaded.location.to_mysql()
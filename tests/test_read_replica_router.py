@@ -0,0 +1,75 @@
+"""读写分离路由, 以两个 sqlite 内存库模拟主库与只读副本"""
+from collections.abc import AsyncIterator
+
+import pytest
+from tortoise import Tortoise, fields, connections
+from tortoise.utils import get_schema_sql
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+from starlette_context import request_cycle_context
+
+from conf.defines import replica_connection_name
+from common.tortoise.router import replica_reads
+
+PRIMARY = "primary"
+REPLICA = replica_connection_name(PRIMARY, 0)
+
+
+class Item(Model):
+    id = fields.IntField(pk=True)
+    name = fields.CharField(max_length=32)
+
+    class Meta:
+        app = "replica_test"
+
+
+@pytest.fixture()
+async def databases() -> AsyncIterator[None]:
+    await Tortoise.init(
+        config={
+            "connections": {PRIMARY: "sqlite://:memory:", REPLICA: "sqlite://:memory:"},
+            "apps": {"replica_test": {"models": [__name__], "default_connection": PRIMARY}},
+            "routers": ["common.tortoise.router.ReadReplicaRouter"],
+        },
+    )
+    await Tortoise.generate_schemas()
+    replica = connections.get(REPLICA)
+    await replica.execute_script(get_schema_sql(connections.get(PRIMARY), safe=False))
+    # 副本中的数据与主库不同, 用于区分读取的来源
+    await replica.execute_insert("INSERT INTO item (id, name) VALUES (?, ?)", [1, "replica"])
+    await connections.get(PRIMARY).execute_insert("INSERT INTO item (id, name) VALUES (?, ?)", [1, "primary"])
+    yield
+    await Tortoise.close_connections()
+
+
+async def names() -> list[str]:
+    return await Item.all().order_by("id").values_list("name", flat=True)  # type: ignore
+
+
+@pytest.mark.anyio
+async def test_reads_use_primary_by_default(databases: None) -> None:
+    assert await names() == ["primary"]
+
+
+@pytest.mark.anyio
+async def test_replica_reads_use_replica(databases: None) -> None:
+    with replica_reads():
+        assert await names() == ["replica"]
+        assert await Item.all().count() == 1
+
+
+@pytest.mark.anyio
+async def test_read_your_writes_in_request(databases: None) -> None:
+    with request_cycle_context({}):
+        with replica_reads():
+            assert await names() == ["replica"]
+        await Item.create(name="written")
+        with replica_reads():
+            assert await names() == ["primary", "written"]
+
+
+@pytest.mark.anyio
+async def test_transaction_reads_use_primary(databases: None) -> None:
+    async with in_transaction(PRIMARY):
+        with replica_reads():
+            assert await names() == ["primary"]